@@ -1,9 +1,11 @@
-from pygetwindow import getActiveWindow as gw
-from frontend import *
+#worker processes (duplicates.py) importeren deze module opnieuw onder spawn, enkel het hoofdproces start de app
+if __name__ == "__main__":
+    from pygetwindow import getActiveWindow as gw
+    from frontend import *
 
-terminal = None
-while terminal is None:
-    terminal = gw.getActiveWindow()
-if terminal:
-    app = TerminalApp(terminal, klanten)
-    app.run()
\ No newline at end of file
+    terminal = None
+    while terminal is None:
+        terminal = gw.getActiveWindow()
+    if terminal:
+        app = TerminalApp(terminal, klanten)
+        app.run()
@@ -12,6 +12,7 @@ class AppMode(Enum):
     SELECTING = auto()     # Selecting a related object (for Reservering)
     MENU = auto()          # Navigating main menu
     REQUEST = auto()
+    GLOBAL = auto()        # Input field focused for a search over all scribes
 
 @dataclass
 class AppState:
@@ -23,6 +24,7 @@ class AppState:
     
     # UI state
     sidepanel_open: bool = True
+    diagnostics_open: bool = False
     menu_idx: int = 0
     
     # Editing/Creating state
@@ -99,7 +101,7 @@ class AppState:
     @property
     def is_input_focused(self) -> bool:
         """Check if input field should be focused"""
-        return self.mode in (AppMode.SEARCHING, AppMode.REQUEST)
+        return self.mode in (AppMode.SEARCHING, AppMode.REQUEST, AppMode.GLOBAL)
     
     @property
     def is_table_focused(self) -> bool:
@@ -134,11 +136,13 @@ class ModeKeyBindings:
             return [
                 KeyBinding("m", "Menu", None),
                 KeyBinding("f", "Fuzzy Find", None),
+                KeyBinding("g", "Global Find", None),
                 KeyBinding("e", "Edit", None),
                 KeyBinding("d", "Delete", None),
                 KeyBinding("c", "Create", None),
                 KeyBinding("j", "Cursor Down", None),
                 KeyBinding("k", "Cursor Up", None),
+                KeyBinding("p", "Diagnostics", None),
             ]
         elif mode == AppMode.SEARCHING:
             return [
@@ -173,11 +177,19 @@ class ModeKeyBindings:
         elif mode == AppMode.MENU:
             return [
                 KeyBinding("f", "Fuzzy Find", None),
+                KeyBinding("g", "Global Find", None),
                 KeyBinding("j", "Down", None),
                 KeyBinding("k", "Up", None),
                 KeyBinding("Enter", "Select", None),
                 KeyBinding("Esc", "Close Menu", None),
             ]
+        elif mode == AppMode.GLOBAL:
+            return [
+                KeyBinding("Enter", "Jump", None),
+                KeyBinding("↓", "Next", None),
+                KeyBinding("↑", "Prev", None),
+                KeyBinding("Esc", "Cancel", None),
+            ]
         elif mode == AppMode.REQUEST:
             return [
                 KeyBinding("Enter", "Submit", None),
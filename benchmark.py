@@ -0,0 +1,177 @@
+"""
+Offline benchmark suite for the core operations at scale.
+
+    python benchmark.py run --sizes 1000 100000 1000000 --output bench.json
+    python benchmark.py compare base.json head.json --threshold 0.10
+
+Every size is a synthetic dataset from dummydata (size klanten and size reserveringen) loaded through
+datastore. Results are stored as JSON so the runs of two commits can be compared automatically.
+"""
+import gc
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable
+
+from rich.console import Console
+
+import datastore
+from datastore import klanten, reserveringen, read_data, save_data
+from datamodel import Factuur
+from datascrivener import AttributeFilter, RangeFilter
+from dummydata import generate_dataset, write_dataset
+from hawktui import DataTable
+
+SIZES = [1_000, 100_000, 1_000_000]
+TYPED_QUERY = "isabelle hasselt"
+
+def _typing(query: str) -> list[str]:
+    """Every prefix of the query, as typed one key at a time."""
+    return [query[:i] for i in range(1, len(query) + 1)]
+
+def _backspacing(query: str) -> list[str]:
+    """Every prefix of the query, as removed one key at a time."""
+    return [query[:i] for i in range(len(query) - 1, -1, -1)]
+
+def timeit(func: Callable[[], Any], repeat: int, setup: Callable[[], Any] | None = None) -> dict[str, float]:
+    """Run func `repeat` times (after an optional untimed setup) with the garbage collector disabled."""
+    timings: list[float] = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return {
+        "repeat": repeat,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+    }
+
+def run_query_sequence(queries: list[str]) -> None:
+    for query in queries:
+        klanten.run_query(query)
+
+def get_suggestion_sequence(queries: list[str]) -> None:
+    for query in queries:
+        klanten.get_suggestion(query)
+
+def bill_all() -> None:
+    for r in reserveringen.all:
+        Factuur.from_finalize_reservatie(r, r.tot + timedelta(days=2))
+
+def benchmarks() -> list[tuple[str, Callable[[], Any], Callable[[], Any] | None]]:
+    """(name, timed function, untimed setup) for one dataset size."""
+    table = DataTable(Console(file=io.StringIO(), width=160, height=60, color_system='256'), klanten)
+    duur = RangeFilter('duur', start=4)
+    particulier = AttributeFilter('strftype', 'Particulier')
+    typing, backspacing = _typing(TYPED_QUERY), _backspacing(TYPED_QUERY)
+    def reset() -> None:
+        klanten.refresh(all=True)
+    def typed() -> None:
+        klanten.refresh(all=True)
+        run_query_sequence(typing)
+    return [
+        ("read_data", read_data, None),
+        ("save_data", save_data, None),
+        ("klanten.refresh", lambda: klanten.refresh(all=True), None),
+        ("reserveringen.refresh", lambda: reserveringen.refresh(all=True), None),
+        ("klanten.set_filter", lambda: klanten.set_filter(particulier), reset),
+        ("reserveringen.set_filter", lambda: reserveringen.set_filter(duur), lambda: reserveringen.refresh(all=True)),
+        ("run_query.typing", lambda: run_query_sequence(typing), reset),
+        ("run_query.backspacing", lambda: run_query_sequence(backspacing), typed),
+        ("get_suggestion.typing", lambda: get_suggestion_sequence(typing), reset),
+        ("DataTable.compose", lambda: table.compose(focused=True), reset),
+        #muteert reserveringen en voertuigen, dus als laatste
+        ("Factuur.finalize_reservatie", bill_all, None),
+    ]
+
+def run(sizes: list[int], repeat: int, seed: int) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            path = Path(tmp) / f"bench_{size}.json"
+            write_dataset(generate_dataset(size, klanten=size, voertuigen=max(10, size // 8), seed=seed), path)
+            datastore.DATA_FILE = str(path)
+            read_data()
+            #grote datasets minder vaak herhalen
+            reps = repeat if size < 1_000_000 else 1
+            for name, func, setup in benchmarks():
+                timing = timeit(func, reps, setup)
+                results[f"{name}@{size}"] = {"name": name, "size": size, **timing}
+                print(f"{name:<30} {size:>9}  median {timing['median']*1000:>10.2f}ms  min {timing['min']*1000:>10.2f}ms")
+    return {"meta": _meta(sizes, repeat, seed), "results": results}
+
+def _meta(sizes: list[int], repeat: int, seed: int) -> dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sizes": sizes,
+        "repeat": repeat,
+        "seed": seed,
+    }
+
+def compare(base: dict[str, Any], head: dict[str, Any], threshold: float) -> list[str]:
+    """Print median ratios head/base. Returns the keys that regressed by more than threshold."""
+    regressions: list[str] = []
+    for key, new in head["results"].items():
+        old = base["results"].get(key)
+        if old is None:
+            continue
+        ratio = new["median"] / old["median"] if old["median"] else float("inf")
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "REGRESSION"
+            regressions.append(key)
+        elif ratio < 1 - threshold:
+            flag = "faster"
+        print(f"{key:<40} {old['median']*1000:>10.2f}ms -> {new['median']*1000:>10.2f}ms  x{ratio:5.2f}  {flag}")
+    return regressions
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark the core fuzzy-crud operations.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="run the suite and save the results as JSON")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--seed", type=int, default=2025)
+    run_parser.add_argument("--output", default="bench.json")
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("head")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative slowdown of the median")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        report = run(args.sizes, args.repeat, args.seed)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4)
+    else:
+        with open(args.base, encoding="utf-8") as f:
+            base = json.load(f)
+        with open(args.head, encoding="utf-8") as f:
+            head = json.load(f)
+        regressions = compare(base, head, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+            sys.exit(1)
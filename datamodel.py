@@ -1,10 +1,58 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, InitVar
 from datetime import date
-from typing import ClassVar, Generator, Any, Self
+from typing import ClassVar, Callable, Any, Self, Iterable, NamedTuple
+from threading import Lock
 import numpy as np
 from enum import Enum
+from sys import intern
 
 # --- Field Type Definities (String-Fu) ---
+class EnumLexicon[E: Enum]:
+    """
+    Token lookup for parsing enums, built once per enum.
+    Tokens are stripped and casefolded; values, names and descriptions are always tokens, synonyms can be added.
+    """
+    def __init__(self, enum: type[E], descriptions: dict[E, str], synonyms: dict[str, E] | None = None):
+        self.enum = enum
+        self.descriptions = descriptions
+        self._tokens: dict[str, E] = {}
+        #ruwe invoer die al eens geparsed is, vb. "M" of " bestelbus"
+        self._seen: dict[str, E] = {}
+        for member in enum:
+            self.add(member.value, member)
+            self.add(member.name, member)
+            self.add(descriptions[member], member)
+        for token, member in (synonyms or {}).items():
+            self.add(token, member)
+
+    @staticmethod
+    def normalize(token: str) -> str:
+        return token.strip().casefold()
+
+    def add(self, token: str, member: E) -> None:
+        """Register a synonym."""
+        self._tokens[self.normalize(token)] = member
+        self._seen.clear()
+
+    def get(self, data: str) -> E | None:
+        member = self._seen.get(data)
+        if member is None:
+            member = self._tokens.get(self.normalize(data))
+            if member is not None:
+                self._seen[data] = member
+        return member
+
+    def parse_many(self, data: Iterable[str], error: str) -> list[E]:
+        """Parse every value, raises ValueError(error.format(value)) on the first unknown one."""
+        parsed: list[E] = []
+        get = self.get
+        for value in data:
+            member = get(value)
+            if member is None:
+                raise ValueError(error.format(value.strip().capitalize()))
+            parsed.append(member)
+        return parsed
+
 class Gender(str, Enum):
     Male = "M"
     Female = "V"
@@ -12,34 +60,30 @@ class Gender(str, Enum):
     @property
     def description(self) -> str:
         """Human-readable value"""
-        return {
-            "M": "Man",
-            "V": "Vrouw",
-        }[self.value]
+        return GENDER_LEXICON.descriptions[self]
     
     @classmethod
     def parse(cls, data: str) -> 'Gender':
         """Parse from strings"""
-        data = data.strip().capitalize()
-        # char match
-        for gender in cls:
-            if gender.value == data.upper():
-                return gender
-        # woord match
-        synonym = {
-            "Man": cls.Male,
-            "Male": cls.Male,
-            "Vrouw": cls.Female,
-            "Female": cls.Female,
-        }
-        if data in synonym:
-            return synonym[data]
-        
-        raise ValueError(f"Invalid attack-helicopter: {data}.")
+        gender = GENDER_LEXICON.get(data)
+        if gender is None:
+            raise ValueError(f"Invalid attack-helicopter: {data.strip().capitalize()}.")
+        return gender
+
+    @classmethod
+    def parse_many(cls, data: Iterable[str]) -> list['Gender']:
+        """Parse a column of strings (load paths)"""
+        return GENDER_LEXICON.parse_many(data, "Invalid attack-helicopter: {}.")
     
     def __str__(self) -> str:
         """Display the description by default"""
         return self.name 
+
+GENDER_LEXICON: EnumLexicon[Gender] = EnumLexicon(Gender, 
+    descriptions={
+        Gender.Male: "Man",
+        Gender.Female: "Vrouw",
+    })
     
 class VoertuigCategorie(str, Enum):
     M1 = "M1"   # Personenwagen <9 zitplaatsen
@@ -52,45 +96,43 @@ class VoertuigCategorie(str, Enum):
     @property
     def description(self) -> str:
         """Human-readable value"""
-        return {
-            "M1": "Personenwagen",
-            "M2": "Minibus",
-            "M3": "Bus",
-            "N1": "Bestelbus",
-            "N2": "Bakwagen",
-            "N3": "Vrachtwagen"
-            }[self.value]
+        return CATEGORIE_LEXICON.descriptions[self]
     
     @classmethod
     def parse(cls, data: str) -> 'VoertuigCategorie':
         """Parse from code (M1, N1) or name (Personenwagen, Bestelbus) strings"""
-        data = data.strip().capitalize()
-        # code match
-        for categorie in cls:
-            if categorie.value == data.upper():
-                return categorie
-        # woord match
-        synonym = {
-            "Personenwagen": cls.M1,
-            "Personenauto": cls.M1,
-            "Auto": cls.M1,
-            "Minibus": cls.M2,
-            "Bus": cls.M3,
-            "Bestelwagen": cls.N1,
-            "Bestelbusje": cls.N1,
-            "Combi": cls.N1,
-            "Bakwagen": cls.N2,
-            "Vrachtwagen": cls.N3
-            }
-        if data in synonym:
-            return synonym[data]
-        # Fail
-        raise ValueError(f"Invalid category: {data}")
+        categorie = CATEGORIE_LEXICON.get(data)
+        if categorie is None:
+            # Fail
+            raise ValueError(f"Invalid category: {data.strip().capitalize()}")
+        return categorie
+
+    @classmethod
+    def parse_many(cls, data: Iterable[str]) -> list['VoertuigCategorie']:
+        """Parse a column of strings (load paths)"""
+        return CATEGORIE_LEXICON.parse_many(data, "Invalid category: {}")
     
     def __str__(self) -> str:
         """Display the description by default"""
         return self.description  
 
+CATEGORIE_LEXICON: EnumLexicon[VoertuigCategorie] = EnumLexicon(VoertuigCategorie,
+    descriptions={
+        VoertuigCategorie.M1: "Personenwagen",
+        VoertuigCategorie.M2: "Minibus",
+        VoertuigCategorie.M3: "Bus",
+        VoertuigCategorie.N1: "Bestelbus",
+        VoertuigCategorie.N2: "Bakwagen",
+        VoertuigCategorie.N3: "Vrachtwagen",
+    },
+    synonyms={
+        "Personenauto": VoertuigCategorie.M1,
+        "Auto": VoertuigCategorie.M1,
+        "Bestelwagen": VoertuigCategorie.N1,
+        "Bestelbusje": VoertuigCategorie.N1,
+        "Combi": VoertuigCategorie.N1,
+    })
+
 class VIN(str):
     legal_characters: ClassVar[str] = '0123456789ABCDEFGHJKLMNPRSTUVWXYZ'
     legal_chk_digits: ClassVar[str] = '0123456789X'
@@ -122,12 +164,45 @@ class VIN(str):
         chk_sum: int = sum(cls.weights[i] * v for i, v in enumerate(translt)) % 11
         return cls.legal_chk_digits[chk_sum]
     
+    @classmethod
+    def validate_many(cls, data: Iterable[str]) -> np.ndarray:
+        """Array version of isvalid. Returns a bool array."""
+        chars, valid = _char_matrix(data, 17)
+        values = _lookup_table(cls.vintoi)[chars]
+        legal = (values >= 0).all(axis=1)
+        chk = np.frombuffer(cls.legal_chk_digits.encode('ascii'), dtype=np.uint8)[cls._checksum_codes(values)]
+        valid[valid] = legal & (chars[:, 8] == chk)
+        return valid
+
+    @classmethod
+    def checksum_many(cls, data: Iterable[str]) -> np.ndarray:
+        """Array version of _checksum for well-formed VINs. Returns a str array."""
+        chars, valid = _char_matrix(data, 17)
+        values = _lookup_table(cls.vintoi)[chars]
+        if not valid.all() or (values < 0).any():
+            raise ValueError("Malformed VIN in batch")
+        return np.array(list(cls.legal_chk_digits))[cls._checksum_codes(values)]
+
+    @classmethod
+    def _checksum_codes(cls, values: np.ndarray) -> np.ndarray:
+        return (values * np.array(cls.weights)).sum(axis=1) % 11
+
     @classmethod
     def generate(cls) -> 'VIN':
-        base = ''.join(np.random.choice(list(cls.legal_characters), size=17))
-        chk = cls._checksum(base)
-        data = base[:8] + chk + base[9:]
-        return VIN(data)
+        return VIN(cls.generate_many(1)[0])
+
+    @classmethod
+    def generate_many(cls, n: int, rng: np.random.Generator | None = None) -> np.ndarray:
+        """Generate n valid VINs at once. Returns a str array of shape (n,)."""
+        rng = rng if rng is not None else _rng
+        legal = np.frombuffer(cls.legal_characters.encode('ascii'), dtype=np.uint8)
+        values = np.array([cls.vintoi[c] for c in cls.legal_characters], dtype=np.int64)
+        idx = rng.integers(0, len(legal), size=(n, 17))
+        #checkdigit op positie 9 (gewicht 0, dus de willekeurige waarde telt niet mee)
+        chk = cls._checksum_codes(values[idx])
+        chars = legal[idx]
+        chars[:, 8] = np.frombuffer(cls.legal_chk_digits.encode('ascii'), dtype=np.uint8)[chk]
+        return _ascii_rows(chars)
   
 class BTW(str):
     legal_characters: ClassVar[str] = '0123456789.'
@@ -151,14 +226,47 @@ class BTW(str):
         numbersonly = data.replace('.','')
         btw_num: str = numbersonly[:8]
         chk_num: int = 97 - int(btw_num) % 97
-        return str(chk_num)
+        return f"{chk_num:02d}"
+
+    @classmethod
+    def validate_many(cls, data: Iterable[str]) -> np.ndarray:
+        """Array version of isvalid. Returns a bool array."""
+        chars, valid = _char_matrix(data, 12)
+        digits = chars[:, _BTW_DIGITS] - ord('0')
+        legal = (chars[:, 4] == ord('.')) & (chars[:, 8] == ord('.')) & ((digits >= 0) & (digits <= 9)).all(axis=1)
+        numbers = _to_int(np.where(legal[:, None], digits, 0))
+        valid[valid] = legal & (97 - numbers // 100 % 97 == numbers % 100)
+        return valid
+
+    @classmethod
+    def checksum_many(cls, data: Iterable[str]) -> np.ndarray:
+        """Array version of _checksum for BTW numbers formatted as DDDD.DDD.D(CC). Returns a str array."""
+        chars = _char_prefix(data, 10)
+        digits = chars[:, _BTW_DIGITS[:8]] - ord('0')
+        if ((digits < 0) | (digits > 9)).any():
+            raise ValueError("Malformed BTW number in batch")
+        return np.char.zfill((97 - _to_int(digits) % 97).astype(str), 2)
 
     @classmethod
     def generate(cls) -> 'BTW':
-        x, y, z = np.random.randint(100,1000), np.random.randint(100,1000), np.random.randint(0,10)
-        data = f"{np.random.choice([0,1])}{x:04d}.{y:03d}.{z:01d}"
-        data += cls._checksum(data)
-        return BTW(data)
+        return BTW(cls.generate_many(1)[0])
+
+    @classmethod
+    def generate_many(cls, n: int, rng: np.random.Generator | None = None, nummers: np.ndarray | None = None) -> np.ndarray:
+        """
+        Generate n valid BTW numbers (0xxx.xxx.xxx or 1xxx.xxx.xxx, like generate) at once. Returns a str array of shape (n,).
+        nummers: optional bases below 2e7 (the first digit 0 or 1 and the next 7) to control uniqueness, random otherwise.
+        """
+        rng = rng if rng is not None else _rng
+        if nummers is None:
+            nummers = rng.integers(1_000_000, 20_000_000, size=n)
+        nummers = np.asarray(nummers, dtype=np.int64)
+        chk = 97 - nummers % 97
+        digits = _ascii_digits(nummers * 100 + chk, 10)
+        #D DDD . DDD . D CC
+        chars = np.full((len(nummers), 12), ord('.'), dtype=np.uint8)
+        chars[:, _BTW_DIGITS] = digits
+        return _ascii_rows(chars)
 
 class RRN(str):
     legal_characters: ClassVar[str] = '0123456789.-'
@@ -192,14 +300,61 @@ class RRN(str):
         chk_num: int = 97 - int(rrn_num) % 97
         return f"{chk_num:02d}"
 
+    @classmethod
+    def validate_many(cls, data: Iterable[str]) -> np.ndarray:
+        """Array version of isvalid (without the diagnostics printing). Returns a bool array."""
+        chars, valid = _char_matrix(data, 15)
+        digits = chars[:, _RRN_DIGITS] - ord('0')
+        legal = ((digits >= 0) & (digits <= 9)).all(axis=1) & (chars[:, 8] == ord('-'))
+        legal &= (chars[:, [2, 5, 12]] == ord('.')).all(axis=1)
+        numbers = _to_int(np.where(legal[:, None], digits, 0))
+        valid[valid] = legal & (cls._checksum_codes(numbers // 100) == numbers % 100)
+        return valid
+
+    @classmethod
+    def checksum_many(cls, data: Iterable[str]) -> np.ndarray:
+        """Array version of _checksum for RRNs formatted as YY.MM.DD-XXX(.CC). Returns a str array."""
+        chars = _char_prefix(data, 12)
+        digits = chars[:, _RRN_DIGITS[:9]] - ord('0')
+        if ((digits < 0) | (digits > 9)).any():
+            raise ValueError("Malformed RRN in batch")
+        return np.char.zfill(cls._checksum_codes(_to_int(digits)).astype(str), 2)
+
+    @classmethod
+    def _checksum_codes(cls, rrn_num: np.ndarray) -> np.ndarray:
+        #eeuwenwisseling
+        yy = rrn_num // 10_000_000
+        return 97 - (rrn_num + np.where(yy <= date.today().year%100, 2_000_000_000, 0)) % 97
+
     @classmethod
     def generate(cls, geboortedatum: date, is_man: bool) -> 'RRN':
-        x: str = geboortedatum.strftime("%y.%m.%d")
-        y: int = np.random.randint(0,499)*2     #0 =< y =< 996
-        y += 1 if is_man else 2                 #0 < y < 999
-        data = f"{x}-{y:03d}."
-        data += cls._checksum(data)
-        return RRN(data)
+        geboortedata = np.array([geboortedatum], dtype='datetime64[D]')
+        return RRN(cls.generate_many(geboortedata, np.array([is_man]))[0])
+
+    @classmethod
+    def generate_many(cls, geboortedata: np.ndarray, is_man: np.ndarray, rng: np.random.Generator | None = None, 
+                      volgnummers: np.ndarray | None = None) -> np.ndarray:
+        """
+        Generate valid RRNs for arrays of birth dates (datetime64[D]) and genders. Returns a str array.
+        volgnummers: optional counters 0..498 to control uniqueness, random otherwise.
+        """
+        rng = rng if rng is not None else _rng
+        geboortedata = np.asarray(geboortedata, dtype='datetime64[D]')
+        if volgnummers is None:
+            volgnummers = rng.integers(0, 499, size=len(geboortedata))
+        y = np.asarray(volgnummers, dtype=np.int64)*2 + np.where(is_man, 1, 2)     #0 < y < 999
+        jaar = geboortedata.astype('datetime64[Y]')
+        maand = geboortedata.astype('datetime64[M]')
+        yy = (jaar.astype(np.int64) + 1970) % 100
+        mm = (maand - jaar).astype(np.int64) + 1
+        dd = (geboortedata - maand).astype(np.int64) + 1
+        rrn_num = ((yy * 100 + mm) * 100 + dd) * 1000 + y
+        digits = _ascii_digits(rrn_num * 100 + cls._checksum_codes(rrn_num), 11)
+        #YY . MM . DD - YYY . CC
+        chars = np.full((len(geboortedata), 15), ord('.'), dtype=np.uint8)
+        chars[:, _RRN_DIGITS] = digits
+        chars[:, 8] = ord('-')
+        return _ascii_rows(chars)
 
 class Bouwjaar(date):
     def __new__(cls, year: int | str):
@@ -215,22 +370,145 @@ class Bouwjaar(date):
         return (self.__class__, (self.year,))
 
 # --- Generator en Helper functies ---
+_rng: np.random.Generator = np.random.default_rng()
+
+#posities van de cijfers in het geformatteerde nummer
+_BTW_DIGITS: list[int] = [0, 1, 2, 3, 5, 6, 7, 9, 10, 11]
+_RRN_DIGITS: list[int] = [0, 1, 3, 4, 6, 7, 9, 10, 11, 13, 14]
+
+def _lookup_table(mapping: dict[str, int]) -> np.ndarray:
+    """ASCII lookup table for a char->int mapping, -1 for illegal characters."""
+    table = np.full(128, -1, dtype=np.int64)
+    for char, value in mapping.items():
+        table[ord(char)] = value
+    return table
+
+def _char_matrix(data: Iterable[str], width: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Code points of all strings of exactly `width` characters as an (n_ok, width) matrix, plus the bool mask 
+    of which strings had that length. Non-ASCII characters are mapped to NUL, which no lookup table accepts.
+    """
+    strings = np.asarray(data if isinstance(data, np.ndarray) else list(data), dtype=str)
+    valid = np.char.str_len(strings) == width if strings.size else np.zeros(0, dtype=bool)
+    chars = np.ascontiguousarray(strings[valid].astype(f'U{width}')).view(np.uint32).reshape(-1, width)
+    return np.where(chars < 128, chars, 0), valid
+
+def _char_prefix(data: Iterable[str], width: int) -> np.ndarray:
+    """Code points of the first `width` characters of every string. Raises ValueError when one is too short."""
+    strings = np.asarray(data if isinstance(data, np.ndarray) else list(data), dtype=str)
+    if strings.size and (np.char.str_len(strings) < width).any():
+        raise ValueError("Malformed value in batch")
+    chars = np.ascontiguousarray(strings.astype(f'U{width}')).view(np.uint32).reshape(-1, width)
+    return np.where(chars < 128, chars, 0)
+
+def _to_int(digits: np.ndarray) -> np.ndarray:
+    """Interpret each row of a digit matrix as one decimal number."""
+    powers = 10 ** np.arange(digits.shape[1] - 1, -1, -1, dtype=np.int64)
+    return digits.astype(np.int64) @ powers
+
+def _ascii_digits(values: np.ndarray, width: int) -> np.ndarray:
+    """Zero-padded decimal digits of an int array as an (n, width) matrix of ASCII codes."""
+    powers = 10 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+    return (np.asarray(values, dtype=np.int64)[:, None] // powers % 10 + ord('0')).astype(np.uint8)
+
+def _ascii_rows(chars: np.ndarray) -> np.ndarray:
+    """Convert an (n, width) matrix of ASCII codes into a str array of shape (n,)."""
+    width = chars.shape[1]
+    return np.ascontiguousarray(chars).view(f'S{width}').ravel().astype(f'U{width}')
+
 def _deserialize_obj(data: dict[str, Any], key: str, datamap: dict[str, Any]) -> None: #!depreciated
     id = data.get(key)
     if isinstance(id, str):
         data[key] = datamap[id]
 
-def today_generator() -> Generator[str, None, None]:
-    today: str = date.today().strftime("%y%m%d")
-    i: int = 0
-    while True:
-        i += 1
-        yield f"{today}-{i:03d}"
+class ReservatieNummer:
+    """
+    Allocator for reservation numbers "yymmdd-NNN". The sequence restarts every day and is thread-safe.
+    Loaded numbers and the persisted counter are synced in O(1) with observe() and sync().
+    """
+    def __init__(self, today: Callable[[], date] = date.today):
+        self._lock = Lock()
+        self._today = today
+        self._day: str = ""
+        self._last: int = 0
+
+    def __iter__(self) -> Self:
+        return self
+
+    def __next__(self) -> str:
+        return self.allocate(1)[0]
+
+    def _roll(self) -> str:
+        #na middernacht opnieuw beginnen (lock vasthouden)
+        day = self._today().strftime("%y%m%d")
+        if day != self._day:
+            self._day, self._last = day, 0
+        return day
+
+    def allocate(self, n: int) -> list[str]:
+        """Reserve n consecutive numbers of today, for bulk imports."""
+        with self._lock:
+            day = self._roll()
+            first = self._last + 1
+            self._last += n
+        return [f"{day}-{i:03d}" for i in range(first, first + n)]
+
+    def observe(self, nummer: str) -> None:
+        """Account for an existing number, so it is never handed out again."""
+        day, _, volgnummer = nummer.partition('-')
+        if not volgnummer.isdigit():
+            return
+        self.sync(day, int(volgnummer))
+
+    def sync(self, dag: str, volgnummer: int) -> None:
+        """Continue after volgnummer if dag is today (persisted counter)."""
+        with self._lock:
+            if dag == self._roll():
+                self._last = max(self._last, volgnummer)
 
-RESERVATIE_NUMMER: Generator = today_generator()
+    @property
+    def state(self) -> dict[str, Any]:
+        """Persistable counter, see sync()."""
+        with self._lock:
+            return {"dag": self._roll(), "volgnummer": self._last}
+
+RESERVATIE_NUMMER: ReservatieNummer = ReservatieNummer()
+
+def _intern(d: dict[str, Any], *keys: str) -> None:
+    """Intern herhaalde strings (gemeente, merk, ...) zodat alle rijen dezelfde instance delen."""
+    for key in keys:
+        if isinstance(d.get(key), str):
+            d[key] = intern(d[key])
+
+# --- Afgeleide waarden ---
+class Afgeleid(NamedTuple):
+    """Derived values of a Reservering, see Reservering.afgeleid."""
+    uid: str | None
+    status: str
+    duur: int
+    strfklant: str
+    strftype: str
+    strfmerk: str
+    strfmodel: str
+
+class _Afleidbaar:
+    """Keeps a cached Afgeleid per object, dropped as soon as one of the fields in _BRONNEN is set."""
+    #slot buiten de dataclass fields, zodat het niet in fields() (formulieren, save_data) verschijnt
+    __slots__ = ('_afgeleid',)
+    _BRONNEN: ClassVar[frozenset[str]] = frozenset()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+        if name in self._BRONNEN:
+            object.__setattr__(self, '_afgeleid', None)
+
+    def invalideer(self) -> None:
+        """Drop the cached Afgeleid, after a related object (klant, voertuig) changed."""
+        object.__setattr__(self, '_afgeleid', None)
 
 # --- Dataclasses ---
-@dataclass
+#slots: geen __dict__ per instance, __weakref__ slot voor de scribes
+@dataclass(slots=True, weakref_slot=True)
 class Klant:
     naam: str
     straat: str
@@ -246,15 +524,16 @@ class Klant:
     def strftype(self) -> str:
         return self.__class__.__name__.capitalize()
     
-@dataclass
+@dataclass(slots=True)
 class Particulier(Klant):
     geboortedatum: date
     geslacht: Gender
     rijksregisternummer: RRN = field(kw_only=True)
+    gevalideerd: InitVar[bool] = field(default=False, kw_only=True)
 
-    def __post_init__(self):
-        #maak rijksregisternummers
-        if not RRN.isvalid(self.rijksregisternummer):
+    def __post_init__(self, gevalideerd: bool):
+        #maak rijksregisternummers (bulk imports valideren vooraf met RRN.validate_many)
+        if not gevalideerd and not RRN.isvalid(self.rijksregisternummer):
             self.rijksregisternummer = RRN.generate(self.geboortedatum, self.geslacht == "M")
 
     @property
@@ -264,20 +543,21 @@ class Particulier(Klant):
         return self.rijksregisternummer
         
     @classmethod
-    def from_dict(cls, data: dict[str, Any]) -> Self:
-        #maak een instance van JSON Object of Dict
+    def from_dict(cls, data: dict[str, Any], gevalideerd: bool = False, geslacht: Gender | None = None) -> Self:
+        #maak een instance van JSON Object of Dict, geslacht kan al geparsed zijn (Gender.parse_many)
         d = data.copy() #data blijft droog   try
         try: 
             d['huisnummer'] = int(d.get('huisnummer', 0))
             d['postcode'] = int(d.get('postcode', 0))
             d['geboortedatum'] = date.fromisoformat(d.get('geboortedatum', '2001-01-01'))
-            d['geslacht'] = Gender.parse(d.get('geslacht', 'M'))
+            d['geslacht'] = geslacht if geslacht is not None else Gender.parse(d.get('geslacht', 'M'))
             d['rijksregisternummer'] = RRN(d.get('rijksregisternummer', ''))
         except ValueError:
             pass
-        return cls(**d)
+        _intern(d, 'straat', 'gemeente')
+        return cls(**d, gevalideerd=gevalideerd)
 
-@dataclass
+@dataclass(slots=True)
 class Professioneel(Klant):
     btwnummer: BTW
 
@@ -299,9 +579,10 @@ class Professioneel(Klant):
             d['btwnummer'] = BTW(d.get('btwnummer', ''))
         except ValueError:
             pass
+        _intern(d, 'straat', 'gemeente')
         return cls(**d)
 
-@dataclass   
+@dataclass(slots=True, weakref_slot=True)
 class Voertuig:
     chassisnummer: VIN
     merk: str
@@ -322,55 +603,78 @@ class Voertuig:
         return "beschikbaar" if self.beschikbaar else "gereserveerd"
 
     @classmethod
-    def from_dict(cls, data: dict[str, Any]) -> Self:
-        #maak een instance van JSON Object of Dict
+    def from_dict(cls, data: dict[str, Any], categorie: VoertuigCategorie | None = None) -> Self:
+        #maak een instance van JSON Object of Dict, categorie kan al geparsed zijn (VoertuigCategorie.parse_many)
         d = data.copy()
         #hydrateer VIN, Bouwjaar fields
         d['chassisnummer'] = VIN(d.get('chassisnummer', ''))
         d['bouwjaar'] = Bouwjaar(d.get('bouwjaar', '1'))
-        d['categorie'] = VoertuigCategorie.parse(d.get('categorie', 'M1'))
+        d['categorie'] = categorie if categorie is not None else VoertuigCategorie.parse(d.get('categorie', 'M1'))
+        _intern(d, 'merk', 'model')
         return cls(**d)
 
-@dataclass
-class Reservering:
+@dataclass(slots=True, weakref_slot=True)
+class Reservering(_Afleidbaar):
     nummer: str = field(default_factory=lambda: next(RESERVATIE_NUMMER), kw_only=True)
     klant: Klant
     voertuig: Voertuig
     van: date
     tot: date
     ingeleverd: bool | date = field(default=False)
+    #velden waarvan de afgeleide waarden afhangen, klant en voertuig zelf via de scribes (invalideer)
+    _BRONNEN = frozenset(('nummer', 'klant', 'voertuig', 'van', 'tot', 'ingeleverd'))
+
+    def __post_init__(self):
+        self._afgeleid = None
+
+    @property
+    def afgeleid(self) -> Afgeleid:
+        """
+        Derived values, computed once and reused until a source field is set or the klant or voertuig changed
+        (the scribes call invalideer through their reverse indexes). The properties below all read this tuple.
+        """
+        cache = self._afgeleid
+        if cache is None:
+            klant, voertuig = self.klant, self.voertuig
+            cache = Afgeleid(
+                uid=None if klant.uid is None or voertuig.uid is None else self.nummer,
+                status="ingeleverd" if self.ingeleverd else "lopend",
+                duur=(self.tot - self.van).days + 1,
+                strfklant=klant.naam,
+                strftype=klant.strftype,
+                strfmerk=voertuig.merk,
+                strfmodel=voertuig.model,
+            )
+            self._afgeleid = cache
+        return cache
 
     @property
     def uid(self) -> str | None:
-        if self.klant.uid is None or self.voertuig.uid is None:
-            return None
-        return self.nummer
+        return self.afgeleid.uid
     
     @property
     def status(self) -> str:
-        if self.ingeleverd:
-            return "ingeleverd"
-        return "lopend"
+        return self.afgeleid.status
     
     @property
     def duur(self) -> int:
-        return (self.tot - self.van).days + 1
+        return self.afgeleid.duur
     
     @property
     def strfklant(self) -> str: 
-        return self.klant.naam
+        return self.afgeleid.strfklant
     
     @property
     def strftype(self) -> str:
-        return self.klant.strftype
+        return self.afgeleid.strftype
     
     @property
     def strfmerk(self) -> str: 
-        return self.voertuig.merk
+        return self.afgeleid.strfmerk
     
     @property
     def strfmodel(self) -> str: 
-        return self.voertuig.model
+        return self.afgeleid.strfmodel
     
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> Self:
@@ -387,10 +691,16 @@ class Reservering:
             
         return cls(**d)
 
-@dataclass
+@dataclass(slots=True, weakref_slot=True)
 class Factuur:
     reservering: Reservering
     bedrag: float = field(default=0)
+    afgerekend: InitVar[bool] = field(default=False, kw_only=True)
+
+    @property
+    def afgeleid(self) -> Afgeleid:
+        """Derived values of the reservering (cached there)."""
+        return self.reservering.afgeleid
 
     @property
     def uid(self) -> str | None: 
@@ -417,7 +727,10 @@ class Factuur:
         return self.reservering.strfmodel
     
     
-    def __post_init__(self):
+    def __post_init__(self, afgerekend: bool):
+        #reservering en voertuig al afgesloten door finalize_reservatie of FactuurScribe.bill_many
+        if afgerekend:
+            return
         self.reservering.voertuig.beschikbaar = True
         self.reservering.ingeleverd = True
         if self.bedrag == 0:
@@ -436,7 +749,7 @@ class Factuur:
     @classmethod
     def from_finalize_reservatie(cls, r: Reservering, inleverdatum: date|None = None):
         r, bedrag = cls.finalize_reservatie(r, inleverdatum)
-        return cls(r, bedrag)
+        return cls(r, bedrag, afgerekend=True)
     
     @classmethod
     def finalize_reservatie(cls, r: Reservering, inleverdatum: date|None = None):
@@ -3,12 +3,18 @@ THE SCOPE CREEP IS REAL
 """
 from datamodel import *
 from abc import ABC, abstractmethod
-from typing import Any, cast
+from typing import Any, NamedTuple
+from dataclasses import dataclass, field, fields
 from datetime import date
-from rapidfuzz import process, fuzz, utils
 from string import punctuation
-from weakref import ReferenceType, ref, finalize
-from collections.abc import Iterator
+from weakref import ReferenceType, ref
+from collections.abc import Callable, Iterator, Iterable
+from concurrent.futures import ThreadPoolExecutor, wait
+from threading import RLock
+from itertools import repeat
+import numpy as np
+from diagnostics import HotPathStats
+from searchindex import SearchIndex, EditIndex, Field, Term, parse_query
 
 class ObjectFilter(ABC):
     """Base class for filters"""
@@ -17,58 +23,71 @@ class ObjectFilter(ABC):
         """Check if object matches this filter"""
         pass
     
-class Fuzzable[T]:
-    """
-    Wrapper that encapsulates scoring logic,  and matching string.
-    Responsibility for 'fuzzy matching' and 'comparison' lies here.
-    """
-    def __init__(self, obj: T, *searchable_attributes: str):
-        self._obj_ref = ref(obj)
-        self._search_cache: tuple[str, ...]
-        self.match: str | None = None
-        self.score: float = -1
-
-        self.refresh_cache(*searchable_attributes)
+class Snapshot(NamedTuple):
+    """Result of one query: the window in view order and the words scored for it. See TypeScribe.run_query."""
+    query: str
+    window: np.ndarray
+    scores: np.ndarray
+    matches: np.ndarray
+    words: tuple[str, ...]
+    vectors: tuple[np.ndarray, ...]
 
-    @property
-    def obj(self) -> T:
-        if self._obj_ref() is None:
-            raise RuntimeError("Fuzzable accessed after underlying object was collected.")
-        # Dereference: returns the object if it exists
-        return cast(T, self._obj_ref())
-
-    def refresh_cache(self, *args):
-        """Rebuilds the strings used for fuzzy matching."""
-        self._search_cache = tuple(str(getattr(self.obj, attr, None)) for attr in args if getattr(self.obj, attr, None) is not None)
-        self.match = None
-
-    def fuzz(self, query: str) -> float:
-        """
-        Calculate the normalized edit distance of all searchable values.
-        Extracts the best match in a list of choices.
-        """
-        minimum=40 + min(30, 6*len(query))
-        fuzzed = process.extractOne(query, choices=self._search_cache, scorer=fuzz.WRatio, score_cutoff=minimum, processor=utils.default_process)
-        self.match, self.score = fuzzed[:2] if fuzzed else (None, 0)
-        return self.score
+class GlobalHit(NamedTuple):
+    """One result of global_search, tagged with its entity type and owning scribe."""
+    score: float
+    entity: str
+    scribe: 'TypeScribe[Any]'
+    obj: Any
+    match: str | None
 
-    def __gt__(self, other: 'Fuzzable'):
-        return self.score > other.score
-    
-    def __lt__(self, other: 'Fuzzable'):
-        return self.score < other.score
+@dataclass
+class UpdateSummary:
+    """Result of TypeScribe.update_many."""
+    attr: str
+    value: Any
+    matched: int
+    updated: int
+    #row id -> foutmelding
+    failed: dict[int, str] = field(default_factory=dict)
 
 class TypeScribe[T](ABC):
     """
     For when global lists aren't powerful enough. ୧(๑•̀ᗝ•́)૭
     Keeps all my objects safe and only lets others peek from a window.
+    Objects are stored by a stable row id; the window holds row ids, searched through a dictionary encoded SearchIndex.
     """
     def __init__(self, *objects: T):
-        self._objects: list[T] = []
-        self._window: list[Fuzzable[T]] = []
-        self._hidden: list[Fuzzable[T]] = []
+        self._objects: dict[int, T] = {}
+        #identity map id(obj) -> row, geen __eq__ over alle velden
+        self._rows: dict[int, int] = {}
+        self._next_row: int = 0
+        #rows in view volgorde, met score en gematchte kolom per row
+        self._window: np.ndarray = np.empty(0, dtype=np.int64)
+        self._scores: np.ndarray = np.empty(0, dtype=np.float64)
+        self._matches: np.ndarray = np.empty(0, dtype=np.int8)
+        #LIFO stapel van weggefilterde rows
+        self._hidden: np.ndarray = np.empty(0, dtype=np.int64)
+        self._index: SearchIndex = self._new_index()
+        #een global_search worker houdt dit vast zolang hij scoort, wie de index wijzigt of vervangt wacht tot zijn volgende batch
+        self._index_lock = RLock()
+        #reverse indexes: relatie attribuut -> id(doel object) -> rows (geordende set)
+        self._related: dict[str, dict[int, dict[int, None]]] = {attr: {} for attr in self.relations}
+        #scribes met rows die naar onze objecten verwijzen: (scribe, relatie attribuut)
+        self._dependents: list[tuple[TypeScribe[Any], str]] = []
+        #omgekeerd: relatie attribuut -> scribe van de objecten waarnaar verwezen wordt
+        self._sources: dict[str, TypeScribe[Any]] = {}
         self._active_filter: ObjectFilter | None = None
         self._last_query: str = ""
+        #per woord van de query: scores per row id (0 = niet gescoord of geen match)
+        self._words: list[str] = []
+        self._word_scores: list[np.ndarray] = []
+        #resultaat per prefix van de query, onderaan de lege query (alle rows van de view)
+        self._snapshots: list[Snapshot] = []
+        #scoped termen van de snapshots (na de lege query) en de snapshot in de window
+        self._scope: tuple[Term, ...] | None = None
+        self._shown: Snapshot | None = None
+        #None = instrumentatie uit
+        self.stats: HotPathStats | None = None
 
         for obj in objects:
             self.add(obj)
@@ -76,22 +95,34 @@ class TypeScribe[T](ABC):
     @property
     def all(self) -> list[T]:
         """Return all managed objects."""
-        return self._objects
+        return list(self._objects.values())
 
     @property
     def view(self) -> list[T]:
         """Returns the objects in the window."""
-        return [fuzzable.obj for fuzzable in self._window[:]]
+        self._sync()
+        return [self._objects[row] for row in self._window.tolist()]
     
     @property
     def count(self) -> int:
         """Return the total number of objects in the current view."""
+        self._sync()
         return len(self._window)
+
+    @property
+    def hidden(self) -> int:
+        """Number of objects pruned from the view by the current query."""
+        return len(self._hidden)
  
     @property
     def uids(self) -> dict[str, ReferenceType]:
         """Returns a look-up map with references to all objects. Note: Objects T must implement a .uid property."""
-        return {getattr(obj, 'uid'): ref(obj) for obj in self._objects}
+        return {getattr(obj, 'uid'): ref(obj) for obj in self._objects.values()}
+
+    @property
+    def indexes(self) -> dict[str, Any]:
+        """Search structures kept next to the objects, by name. Used for memory accounting."""
+        return {'search': self._index, 'rows': self._rows, 'related': self._related, 'snapshots': self._snapshots}
 
     @property
     @abstractmethod
@@ -99,46 +130,179 @@ class TypeScribe[T](ABC):
         """Returns a list of usuable attribute names for a fuzzeable object."""
         pass
 
+    @property
+    def identifier(self) -> str:
+        """Searchable attribute scored by edit distance instead of WRatio, see searchindex.EditIndex."""
+        return 'uid'
+
+    @property
+    def phonetic_attributes(self) -> tuple[str, ...]:
+        """Searchable attributes holding names, with a Dutch phonetic key index (see searchindex.phonetic_keys)."""
+        return ()
+
+    @property
+    def phonetic_min_keys(self) -> dict[str, int]:
+        """Minimum phonetic key length per phonetic attribute for an exact key to count as a match (default 2)."""
+        return {}
+
+    def _new_index(self, objects: Iterable[Any] = (), edits: EditIndex | None = None) -> SearchIndex:
+        return SearchIndex(self.searchable_attrributes, objects, identifier=self.identifier, edits=edits,
+                           phonetic=self.phonetic_attributes, min_keys=self.phonetic_min_keys)
+
+    @property
+    def relations(self) -> tuple[str, ...]:
+        """Attributes referencing objects of another scribe, kept in reverse indexes."""
+        return ()
+
+    def related(self, attr: str, target: Any) -> list[T]:
+        """Objects whose attr references target (by identity). O(k) in the number of results."""
+        return [self._objects[row] for row in self._related[attr].get(id(target), ())]
+
+    def _link(self, obj: T, row: int | None = None) -> None:
+        row = self._rows.get(id(obj)) if row is None else row
+        if row is None:
+            return
+        for attr, index in self._related.items():
+            target = getattr(obj, attr, None)
+            if target is not None:
+                index.setdefault(id(target), {})[row] = None
+
+    def _unlink(self, obj: T) -> None:
+        row = self._rows.get(id(obj))
+        if row is None:
+            return
+        for attr, index in self._related.items():
+            target = getattr(obj, attr, None)
+            bucket = index.get(id(target))
+            if bucket is not None:
+                bucket.pop(row, None)
+                if not bucket:
+                    del index[id(target)]
+
+    def _relink_all(self) -> None:
+        for index in self._related.values():
+            index.clear()
+        for row, obj in self._objects.items():
+            self._link(obj, row)
+
+    def watch(self, source: 'TypeScribe[Any]', attr: str) -> None:
+        """Re-index the rows whose relation attr references an object of source whenever source changes it."""
+        if attr not in self._related:
+            raise ValueError(f"{attr} is not a relation of {self.__class__.__name__}")
+        source._dependents.append((self, attr))
+        self._sources[attr] = source
+
+    def _propagate(self, objects: Iterable[Any]) -> None:
+        """Re-index only the rows of dependent scribes that reference one of the changed objects."""
+        if not self._dependents:
+            return
+        ids = [id(obj) for obj in objects]
+        for scribe, attr in self._dependents:
+            index = scribe._related[attr]
+            rows = {row: None for i in ids for row in index.get(i, ())}
+            if rows:
+                scribe._reindex_related(np.fromiter(rows, dtype=np.int64, count=len(rows)))
+
+    def _reindex_related(self, rows: np.ndarray) -> None:
+        """Re-encode the derived columns of rows after an object they reference changed, and pass it on."""
+        self._sync()
+        rows = np.sort(rows)
+        self._refresh_rows(rows, self._reindex(rows, None))
+        self._propagate(self._objects[row] for row in rows.tolist())
+
+    def _touched(self, objects: Iterable[Any]) -> None:
+        """Re-index our objects after another scribe changed them (vb. billing sets ingeleverd), and pass it on."""
+        rows = {row: None for obj in objects if (row := self.row_id(obj)) is not None}
+        if rows:
+            self._reindex_related(np.fromiter(rows, dtype=np.int64, count=len(rows)))
+
+    #DIAGNOSTICS
+    def enable_stats(self) -> HotPathStats:
+        """Start recording hot-path counters and timings. Returns the (existing) stats object."""
+        if self.stats is None:
+            self.stats = HotPathStats()
+        return self.stats
+
+    def disable_stats(self) -> HotPathStats | None:
+        """Stop recording. Returns the collected stats."""
+        stats, self.stats = self.stats, None
+        return stats
+
     #LIST DUNDERS
     def __getitem__(self, index: int) -> T:
         """
         I'm a list. I am speed. (و •̀ ᴗ•́ )و
         Indexing on view respects active data views, filters, and sorts.
         """
-        return self._window[index].obj
+        self._sync()
+        return self._objects[self._window[index]]
 
     def __len__(self) -> int:
-        return len(self._window)
+        return self.count
 
     def __iter__(self):
-        # Yields dereferenced dataclasses from window during iteration
-        for fuzzable in self._window:
-            yield fuzzable.obj
+        # Yields dataclasses from window during iteration
+        self._sync()
+        for row in self._window.tolist():
+            yield self._objects[row]
+
+    def row_id(self, obj: T) -> int | None:
+        """Stable row id of a managed object (by identity)."""
+        return self._rows.get(id(obj))
 
     def clear(self) -> None:
         self._objects.clear()
-        self._window.clear()
-        self._hidden.clear()
+        self._rows.clear()
+        for index in self._related.values():
+            index.clear()
+        self._next_row = 0
+        with self._index_lock:
+            self._index = self._new_index()
+        self._set_window(np.empty(0, dtype=np.int64))
+        self._hidden = np.empty(0, dtype=np.int64)
         self._last_query = ""
+        self._words.clear()
+        self._word_scores.clear()
+        self._snapshots.clear()
     
+    def _set_window(self, rows: np.ndarray, scores: np.ndarray | None = None, matches: np.ndarray | None = None) -> None:
+        self._window = rows
+        self._scores = scores if scores is not None else np.zeros(len(rows), dtype=np.float64)
+        self._matches = matches if matches is not None else np.full(len(rows), -1, dtype=np.int8)
+
     #CREATE
     def add(self, obj: T) -> None:
-        self._objects.append(obj)
-        self._add_fuzzable(obj)
+        #index en window worden lui bijgewerkt in _sync, zodat from_array niet per object kopieert
+        row = self._next_row
+        self._next_row += 1
+        self._objects[row] = obj
+        self._rows[id(obj)] = row
+        self._link(obj, row)
 
-    def _add_fuzzable(self, obj: T):
-        fuzzable = Fuzzable(obj, *self.searchable_attrributes)
-        self._window.append(fuzzable)
-        finalize(obj, TypeScribe._remove_fuzzable, fuzzable, self._window, self._hidden)
+    def _live(self, start: int = 0) -> list[T | None]:
+        """Objects by row id from start, None for removed rows (tombstones in the index)."""
+        return [self._objects.get(row) for row in range(start, self._next_row)]
 
-    #REMOVE
-    @staticmethod
-    def _remove_fuzzable(fuzzable: Fuzzable, *lists: list[Fuzzable]):
-        for l in lists:
-            try:
-                l.remove(fuzzable)
-            except ValueError:
-                pass
+    def _searchable(self, objects: list[T | None]) -> list[Any]:
+        """What the search index reads the searchable attributes from, the objects themselves by default."""
+        return objects
+
+    def _sync(self) -> None:
+        """Index objects added since the last sync and append them to the window."""
+        start = len(self._index)
+        if start == self._next_row:
+            return
+        stats = self.stats
+        t = stats.start() if stats else 0
+        with self._index_lock:
+            self._index.extend(self._searchable(self._live(start)))
+        new = np.fromiter((row for row in range(start, self._next_row) if row in self._objects), dtype=np.int64)
+        self._snapshots.clear()
+        self._set_window(np.concatenate((self._window, new)),
+                         np.concatenate((self._scores, np.zeros(len(new)))),
+                         np.concatenate((self._matches, np.full(len(new), -1, dtype=np.int8))))
+        if stats:
+            stats.record('index', t, len(new))
 
     #CONSTRUCT
     @abstractmethod
@@ -150,16 +314,43 @@ class TypeScribe[T](ABC):
         pass
 
     def refresh(self, all=True) -> None:
-        """Reset the search state and populate the current view heap."""
-        self._window.clear()
-        self._hidden.clear()
+        """Reindex all objects and reset the view. all=False keeps the active filter and query."""
+        stats = self.stats
+        #objecten kunnen van buitenaf gewijzigd zijn (vb. status), dus altijd herindexeren
+        t = stats.start() if stats else 0
+        old = self._index
+        index = self._new_index(self._searchable(self._live()), old.edits)
+        #tab completion nu opbouwen in plaats van bij de volgende toetsaanslag
+        index.build_completions(old.completions)
+        with self._index_lock:
+            self._index = index
+        self._relink_all()
+        if stats:
+            stats.record('index', t, len(self._objects))
+        self._reset_view(all)
+
+    def _reset_view(self, all=True) -> None:
+        """Rebuild the window from the current index. all=False re-applies the active filter and query."""
+        stats = self.stats
+        self._hidden = np.empty(0, dtype=np.int64)
+        #window opnieuw opgebouwd: elk woord opnieuw scoren
+        self._words.clear()
+        self._word_scores.clear()
+        self._snapshots.clear()
+        rows = np.fromiter(self._objects.keys(), dtype=np.int64, count=len(self._objects))
         if all:
             self._last_query = ""
             self._active_filter = None
-            self._window = [Fuzzable(obj, *self.searchable_attrributes) for obj in self._objects]
+            self._set_window(rows)
         if not all:
-            collection = [obj for obj in self._objects if self._active_filter.matches(obj)] if self._active_filter else self._objects
-            self._window = [Fuzzable(obj, *self.searchable_attrributes) for obj in collection]
+            if self._active_filter:
+                t = stats.start() if stats else 0
+                matches = self._active_filter.matches
+                rows = np.fromiter((row for row, obj in self._objects.items() if matches(obj)), dtype=np.int64)
+                if stats:
+                    stats.record('filter', t, len(self._objects))
+                    stats.count(f"filter.{type(self._active_filter).__name__}", len(self._objects))
+            self._set_window(rows)
             query = self._last_query.strip(punctuation)
             if query:
                 self.run_query(query)
@@ -171,49 +362,243 @@ class TypeScribe[T](ABC):
         self.refresh(all=False)
 
     def run_query(self, query: str, sort=True) -> None:
-        """Processes a fuzzy query, updates the internal _current_view heap"""
+        """
+        Processes a fuzzy query, updates the internal window.
+        Scoped terms (gemeente:hasselt, dagprijs:<50, van:2025-10) narrow the view through secondary indexes first;
+        every free word then prunes the window, the score of a row is its mean score over the words.
+        Each result is kept as a snapshot keyed by its free text: going back to a prefix (backspace) restores it without
+        scoring, otherwise only the words after the nearest prefix are scored.
+        """
+        self._sync()
         query = query.strip(punctuation)
-        #if backspace recover from _hidden
-        if query < self._last_query:
-            last_word = query.split(" ")[-1]
-            while self._hidden:
-                item = self._hidden.pop()
-                if not query or item.fuzz(last_word) > 0:
-                    self._window.append(item)
-                else:
-                    self._hidden.append(item)
-                    break #LIFO
-        elif query: #!null queries will not fuzz >0
-            for word in query.split(" "):
-                i = 0
-                while i < len(self._window):
-                    item = self._window[i]
-                    #iterate on match else prune
-                    if item.fuzz(word) > 0:
-                        i += 1 
-                    else:
-                        self._hidden.append(item)
-                        self._window.remove(item)
+        terms, text = parse_query(query)
+        stats = self.stats
+        if not self._snapshots:
+            #lege query: alle rows van de view, in row volgorde
+            base = np.sort(np.concatenate((self._window, self._hidden)))
+            self._snapshots.append(Snapshot("", base, np.zeros(len(base)), np.full(len(base), -1, dtype=np.int8), (), ()))
+        if len(self._snapshots) == 1 or terms != self._scope:
+            #andere scoped termen: opnieuw vanaf alle rows van de view
+            del self._snapshots[1:]
+            base = self._snapshots[0]
+            if terms:
+                t = stats.start() if stats else 0
+                self._scope_fields(terms)
+                keep = self._scope_mask(terms, base.window)
+                base = Snapshot("", base.window[keep], base.scores[keep], base.matches[keep], (), ())
+                if stats:
+                    stats.record('filter', t, len(keep))
+                    stats.count('filter.scope', len(keep))
+            self._snapshots.append(base)
+            self._scope = terms
+        t = stats.start() if stats else 0
+        scored, fuzzed = 0, 0
+        #dichtstbijzijnde prefix, langere (of andere) queries vervallen
+        while not text.startswith(self._snapshots[-1].query):
+            self._snapshots.pop()
+        top = self._snapshots[-1]
+        if top is not self._shown:
+            self._restore(top)
+        words = text.split()
+        if text != top.query:
+            #woorden die de window al gesnoeid hebben overslaan
+            done = 0
+            while done < min(len(words), len(self._words)) and words[done] == self._words[done]:
+                done += 1
+            for i in range(done, len(words)):
+                scores, matches, n = self._score_word(i, words[i], self._window)
+                scored, fuzzed = scored + n, fuzzed + len(self._window)
+                #iterate on match else prune
+                keep = scores > 0
+                self._hidden = np.concatenate((self._hidden, self._window[~keep]))
+                self._set_window(self._window[keep], scores[keep], matches[keep])
+            del self._words[len(words):], self._word_scores[len(words):]
+            self._set_window(self._window, self._combined(self._window, len(words)), self._matches)
+        if stats:
+            stats.record('fuzz', t, fuzzed)
+            stats.count('fuzz.calls', scored)
         if sort:
-            self._window = sorted(self._window, key=lambda x: x.score, reverse=True)
+            t = stats.start() if stats else 0
+            order = np.argsort(-self._scores, kind='stable')
+            self._set_window(self._window[order], self._scores[order], self._matches[order])
+            if stats:
+                stats.record('sort', t, len(self._window))
+        if text != top.query:
+            self._shown = Snapshot(text, self._window, self._scores, self._matches, tuple(self._words), tuple(self._word_scores))
+            self._snapshots.append(self._shown)
         #! record last query
         self._last_query = query
 
+    def _restore(self, snapshot: Snapshot) -> None:
+        """Put the window of a snapshot back, every other row of the view is hidden."""
+        base = self._snapshots[0].window
+        shown = np.zeros(len(self._index), dtype=bool)
+        shown[snapshot.window] = True
+        self._hidden = base[~shown[base]]
+        self._set_window(snapshot.window, snapshot.scores, snapshot.matches)
+        self._words[:] = snapshot.words
+        self._word_scores[:] = snapshot.vectors
+        self._shown = snapshot
+
+    def _scope_fields(self, terms: tuple[Term, ...]) -> None:
+        """Build the secondary Field indexes of scoped terms that don't have one yet."""
+        for term in terms:
+            if term.attr not in self._index.fields:
+                secondary = Field(self._scope_attr(term.attr), self._live())
+                with self._index_lock:
+                    self._index.fields[term.attr] = secondary
+
+    def _scope_mask(self, terms: tuple[Term, ...], rows: np.ndarray) -> np.ndarray:
+        """Which rows match every scoped term, through the secondary Field indexes (see _scope_fields)."""
+        keep = np.ones(len(rows), dtype=bool)
+        for term in terms:
+            keep &= self._index.fields[term.attr].mask(term, rows)
+        return keep
+
+    def _scope_attr(self, attr: str) -> str:
+        """Attribute behind a scoped term: the attribute itself or its display property (merk -> strfmerk)."""
+        types = {type(obj) for obj in self._objects.values()}
+        for name in (attr, f"strf{attr}"):
+            if any(hasattr(t, name) for t in types):
+                return name
+        return attr
+
+    def _score_word(self, i: int, word: str, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray, int]:
+        """
+        Score rows for the i-th word of the query and keep the scores by row id, see _combined.
+        Also returns the number of distinct values scored.
+        """
+        with self._index_lock:
+            self._index.prepare(word)
+        scores, matches, scored = self._index.score(word, rows)
+        if i < len(self._words) and self._words[i] == word:
+            vector = self._word_vector(i)
+        else:
+            #later woorden hoorden bij een andere query
+            del self._words[i:], self._word_scores[i:]
+            vector = np.zeros(len(self._index))
+            self._words.append(word)
+            self._word_scores.append(vector)
+        vector[rows] = scores
+        return scores, matches, scored
+
+    def _word_vector(self, i: int) -> np.ndarray:
+        """Scores of the i-th word by row id, padded with zeros for rows added since."""
+        vector = self._word_scores[i]
+        if len(vector) < len(self._index):
+            vector = self._word_scores[i] = np.concatenate((vector, np.zeros(len(self._index) - len(vector))))
+        return vector
+
+    def _combined(self, rows: np.ndarray, n: int) -> np.ndarray:
+        """Mean score of rows over the first n words of the query."""
+        total = np.zeros(len(rows))
+        for i in range(n):
+            total += self._word_vector(i)[rows]
+        return total / n if n else total
+
     def get_suggestion(self, query: str) -> str | None:
-        """Performs a query on the current view and returns the best matching the attribute value."""
+        """
+        Tab completion of the free text of a query, without scoring: the whole text or else its last word is completed
+        from the sorted words of the search index. Only when nothing has that prefix the best fuzzy match of the current
+        view is used, running the query when the view doesn't show it yet.
+        """
         query = query.strip('.- ')
-        self.run_query(query, sort=True)
+        terms, text = parse_query(query)
+        #enkel vrije tekst aanvullen, niet een scoped term
+        if not text or not query.endswith(text.split(" ")[-1]):
+            return None
+        self._sync()
+        words = text.split(" ")
+        completion = self._index.complete(text)
+        if completion is not None:
+            suggestion = self._completed(text, completion)
+        elif len(words) > 1 and (completion := self._index.complete(words[-1])) is not None:
+            suggestion = " ".join([*words[:-1], self._completed(words[-1], completion)])
+        else:
+            suggestion = self._fuzzy_suggestion(query, text)
+        if suggestion:
+            return " ".join([*map(str, terms), suggestion])
+        return None
+
+    @staticmethod
+    def _completed(typed: str, completion: str) -> str:
+        """What was typed followed by the rest of its (normalized) completion."""
+        return typed + completion[len(typed):] if completion.startswith(typed.casefold()) else completion
+
+    def _fuzzy_suggestion(self, query: str, text: str) -> str | None:
+        """The matched value of the best row in the view for query."""
+        if query.strip(punctuation) != self._last_query:
+            self.run_query(query, sort=True)
         # get suggestion from top of the heap
-        suggestion = self._window[0].match if self._window else None
+        suggestion = self._index.match(int(self._window[0]), int(self._matches[0])) if len(self._window) else None
         # formatting fix
         if suggestion:
             s_words = suggestion.split(" ")
-            q_words = query.split(" ")
+            q_words = text.split(" ")
             if len(q_words)>len(s_words):
                 q_words[-1] = s_words[-1]
-                return " ".join(q_words)
-            return suggestion
-        return None
+                suggestion = " ".join(q_words)
+        return suggestion
+
+    def prepare_search(self, query: str) -> None:
+        """Index new objects and build the secondary indexes search(query) needs. Call on the owning thread."""
+        self._sync()
+        terms, text = parse_query(query.strip(punctuation))
+        self._scope_fields(terms)
+        with self._index_lock:
+            for word in text.split():
+                self._index.prepare(word)
+
+    def search(self, query: str, limit: int = 20, stale: Callable[[], bool] | None = None) -> list[tuple[float, int, int]]:
+        """
+        Best rows for a query over all objects, without touching the view, filter or snapshots (see global_search).
+        Doesn't change the scribe or its index once the owner called prepare_search(query), so it can run in a worker thread.
+        Holds the index lock while scoring, so the owner can't change or replace the index halfway.
+        Returns (score, row id, matched column) by descending score; nothing when stale() turns true between batches.
+        """
+        terms, text = parse_query(query.strip(punctuation))
+        words = text.split()
+        if not terms and not words:
+            return []
+        with self._index_lock:
+            return self._search(terms, words, limit, stale or (lambda: False))
+
+    #rows per batch van een search, tussen twee batches stopt een verouderde worker en geeft hij de index lock vrij
+    SEARCH_BATCH = 16384
+
+    def _search(self, terms: tuple[Term, ...], words: list[str], limit: int, stale: Callable[[], bool]) -> list[tuple[float, int, int]]:
+        #tombstones hebben geen waarden en vallen weg bij de eerste term of het eerste woord
+        rows = np.arange(len(self._index), dtype=np.int64)
+        if terms:
+            rows = rows[self._scope_mask(terms, rows)]
+        total = np.zeros(len(rows))
+        matches = np.full(len(rows), -1, dtype=np.int8)
+        for word in words:
+            scores = np.zeros(len(rows))
+            found = np.full(len(rows), -1, dtype=np.int8)
+            for start in range(0, len(rows), self.SEARCH_BATCH):
+                if stale():
+                    return []
+                batch = slice(start, start + self.SEARCH_BATCH)
+                scores[batch], found[batch], _ = self._index.score(word, rows[batch])
+            keep = scores > 0
+            rows, total, matches = rows[keep], total[keep] + scores[keep], found[keep]
+        if words:
+            total /= len(words)
+        if len(rows) > limit:
+            top = np.argpartition(-total, limit)[:limit]
+            rows, total, matches = rows[top], total[top], matches[top]
+        order = np.argsort(-total, kind='stable')
+        return list(zip(total[order].tolist(), rows[order].tolist(), matches[order].tolist()))
+
+    def position(self, obj: T) -> int | None:
+        """Index of an object in the current view, None when it is hidden."""
+        self._sync()
+        row = self.row_id(obj)
+        if row is None:
+            return None
+        found = np.flatnonzero(self._window == row)
+        return int(found[0]) if len(found) else None
 
     #TABULATE
     @abstractmethod
@@ -225,8 +610,18 @@ class TypeScribe[T](ABC):
         """
         Formats and yields rows that are actually requested.
         """
-        for fuzzable in self._window[start:end]:
-            yield self._format_row(fuzzable.obj)
+        self._sync()
+        stats = self.stats
+        if not stats:
+            for row in self._window[start:end].tolist():
+                yield self._format_row(self._objects[row])
+            return
+        #enkel _format_row timen, niet de consument tussen de yields
+        for row in self._window[start:end].tolist():
+            t = stats.start()
+            formatted = self._format_row(self._objects[row])
+            stats.record('format', t)
+            yield formatted
 
     @abstractmethod
     def _format_row(self, obj: T) -> list[str]:
@@ -241,6 +636,160 @@ class TypeScribe[T](ABC):
         '''
         pass
 
+    @property
+    def unique_attributes(self) -> tuple[str, ...]:
+        """Attributes that identify an object and can't be bulk updated."""
+        return ()
+
+    def _hydrate(self, attr: str, value: Any, obj: T | None = None) -> Any:
+        """Convert an input value (usually a str) to the attribute type. obj is None for bulk updates."""
+        return value
+
+    def _validate(self, obj: T, attr: str, value: Any) -> None:
+        """Raise ValueError if a hydrated value is not allowed on this object."""
+        pass
+
+    def _apply(self, obj: T, attr: str, value: Any) -> None:
+        """Set the value, including side effects on related objects."""
+        setattr(obj, attr, value)
+
+    def _assign(self, obj: T, attr: str, value: Any) -> None:
+        """_apply, keeping the reverse indexes up to date."""
+        if attr not in self._related:
+            return self._apply(obj, attr, value)
+        self._unlink(obj)
+        try:
+            self._apply(obj, attr, value)
+        finally:
+            self._link(obj)
+
+    def update_many(self, filter: ObjectFilter | None, attr: str, value: Any) -> 'UpdateSummary':
+        """
+        Set attr to value on every object matching filter (None = all objects).
+        The value is hydrated once, applied in one pass and the search index is updated once.
+        """
+        if attr in self.unique_attributes:
+            raise ValueError(f"Cannot bulk update unique attribute {attr}")
+        self._sync()
+        matched = [(row, obj) for row, obj in self._objects.items() if filter is None or filter.matches(obj)]
+        #onbekende attributen en properties zonder setter (vb. status) vooraf weigeren, per klasse i.p.v. per object
+        types = {type(obj) for _, obj in matched}
+        missing = {t for t in types if not hasattr(t, attr)}
+        if types and missing == types:
+            raise ValueError(f"Failed to find attribute {attr}")
+        readonly = {t for t in types if isinstance(prop := getattr(t, attr, None), property) and prop.fset is None}
+        if types and missing | readonly == types:
+            raise ValueError(f"Attribute {attr} is read-only")
+        try:
+            value = self._hydrate(attr, value)
+        except Exception as e:
+            raise ValueError(f"Failed to set attribute: {e}")
+        updated: list[int] = []
+        failed: dict[int, str] = {}
+        #rows waar _assign aan begon, ook als het daarna faalde: die moeten opnieuw geindexeerd
+        touched: list[int] = []
+        for row, obj in matched:
+            if type(obj) in missing:
+                failed[row] = f"Failed to find attribute {attr}"
+                continue
+            if type(obj) in readonly:
+                failed[row] = f"Attribute {attr} is read-only"
+                continue
+            try:
+                self._validate(obj, attr, value)
+            except Exception as e:
+                failed[row] = str(e)
+                continue
+            touched.append(row)
+            try:
+                self._assign(obj, attr, value)
+                updated.append(row)
+            except Exception as e:
+                failed[row] = f"Failed to set attribute: {e}"
+        self._updated(touched, attr)
+        return UpdateSummary(attr, value, len(matched), len(updated), failed)
+
+    def _apply_many(self, changes: Iterable[tuple[T, Any]], attr: str) -> None:
+        """Validate and apply a hydrated value of attr per object, then re-index their rows once (see update_many)."""
+        rows: list[int] = []
+        for obj, value in changes:
+            self._validate(obj, attr, value)
+            self._assign(obj, attr, value)
+            rows.append(self._rows[id(obj)])
+        self._updated(rows, attr)
+
+    def _updated(self, rows: list[int], attr: str) -> None:
+        """After attr of the objects in rows was set: re-index only those rows and the rows that reference them."""
+        if not rows:
+            return
+        self._sync()
+        rows_array = np.array(rows, dtype=np.int64)
+        self._refresh_rows(rows_array, self._reindex(rows_array, attr))
+        self._propagate(self._objects[row] for row in rows)
+
+    def _reindex(self, rows: np.ndarray, attr: str | None) -> np.ndarray:
+        """
+        Re-encode the rows after attr changed: the attr column and every column that is not a plain field.
+        attr None: only the derived columns, after a related object changed.
+        Returns a mask of the rows whose searchable values changed.
+        """
+        objects = [self._objects[row] for row in rows.tolist()]
+        plain = set.intersection(*({f.name for f in fields(t)} for t in {type(obj) for obj in objects}))
+        names = {name for name in self.searchable_attrributes if name == attr or name not in plain}
+        stats = self.stats
+        t = stats.start() if stats else 0
+        with self._index_lock:
+            changed = self._index.reencode(rows, self._searchable(objects), names)
+        if stats:
+            stats.record('index', t, len(rows))
+        return changed
+
+    def _refresh_rows(self, rows: np.ndarray, changed: np.ndarray) -> None:
+        """
+        Update the view for modified rows only: re-apply the filter to them and re-score the ones whose searchable values changed.
+        Equivalent to refresh(all=False) up to the order of the _hidden stack.
+        """
+        if self._active_filter:
+            matches = self._active_filter.matches
+            passes = np.fromiter((matches(self._objects[row]) for row in rows.tolist()), dtype=bool, count=len(rows))
+        else:
+            passes = np.ones(len(rows), dtype=bool)
+        in_window, in_hidden = np.isin(rows, self._window), np.isin(rows, self._hidden)
+        query = self._last_query
+        terms, text = parse_query(query)
+        if terms:
+            #scoped termen kunnen op niet doorzoekbare attributen staan
+            changed = np.ones(len(rows), dtype=bool)
+        #zelfde filter resultaat en zelfde zoekwaarden: plaats in de view blijft
+        stay = (in_window | in_hidden) & passes & ~changed
+        drop, add = rows[~stay], rows[passes & ~stay]
+        if not len(drop):
+            return
+        self._snapshots.clear()
+        keep = ~np.isin(self._window, drop)
+        window, scores, matches = self._window[keep], self._scores[keep], self._matches[keep]
+        self._hidden = self._hidden[~np.isin(self._hidden, drop)]
+        if terms:
+            self._scope_fields(terms)
+            scoped = self._scope_mask(terms, add)
+            self._hidden = np.concatenate((self._hidden, add[~scoped]))
+            add = add[scoped]
+        words = text.split()
+        add_scores, add_matches = np.zeros(len(add)), np.full(len(add), -1, dtype=np.int8)
+        if words:
+            for i, word in enumerate(words):
+                add_scores, add_matches, _ = self._score_word(i, word, add)
+                hit = add_scores > 0
+                self._hidden = np.concatenate((self._hidden, add[~hit]))
+                add, add_scores, add_matches = add[hit], add_scores[hit], add_matches[hit]
+            add_scores = self._combined(add, len(words))
+        window = np.concatenate((window, add))
+        scores = np.concatenate((scores, add_scores))
+        matches = np.concatenate((matches, add_matches))
+        #zelfde volgorde als een volledige refresh: score aflopend, dan row id
+        order = np.lexsort((window, -scores)) if query else np.argsort(window, kind='stable')
+        self._set_window(window[order], scores[order], matches[order])
+
     #CREATE
     @abstractmethod
     def create_default(self, obj_type: type = type(T)) -> T | None:
@@ -253,35 +802,77 @@ class TypeScribe[T](ABC):
     #REMOVE
     def remove(self, obj: T | int) -> None:
         """Remove an object by reference or index"""
+        self._sync()
         # Handle index-based removal
         if isinstance(obj, int):
             if 0 <= obj < len(self._window):
-                fuzz = self._window.pop(obj)
-                obj = fuzz.obj
+                obj = self._objects[int(self._window[obj])]
             else:
                 raise IndexError("Index out of range")
-        
-        # Remove from _objects
-        try:
-            self._objects.remove(obj)
-            #self.refresh(all=False)
-        except ValueError:
-            pass  # Object not in list
+        self.remove_many([obj])
+
+    def remove_many(self, selection: 'ObjectFilter | Iterable[int | T]') -> int:
+        """
+        Remove all objects matching a filter, or a collection of row ids and/or objects.
+        The views are rebuilt once. Returns the number of removed objects.
+        """
+        self._sync()
+        if isinstance(selection, ObjectFilter):
+            rows = [row for row, obj in self._objects.items() if selection.matches(obj)]
+        else:
+            rows = [int(item) if isinstance(item, (int, np.integer)) else self._rows.get(id(item), -1) for item in selection]
+        removed: list[int] = []
+        for row in rows:
+            obj = self._objects.get(row)
+            if obj is None:
+                continue # Object not in scribe
+            self._unlink(obj)
+            del self._objects[row]
+            del self._rows[id(obj)]
+            removed.append(row)
+        if removed:
+            #row ids blijven stabiel, de index houdt een tombstone
+            dead = np.array(removed, dtype=np.int64)
+            with self._index_lock:
+                self._index.drop(dead)
+            keep = ~np.isin(self._window, dead)
+            self._set_window(self._window[keep], self._scores[keep], self._matches[keep])
+            self._hidden = self._hidden[~np.isin(self._hidden, dead)]
+            self._snapshots.clear()
+        return len(removed)
 
 class KlantScribe(TypeScribe[Klant]):
     """Scribe for managing Klanten (Particulier/Professioneel)."""
    
     @property
     def searchable_attrributes(self) -> tuple[str,...]:
-        return 'uid', 'naam', 'postcode', 'gemeente', 'strftype'
+        return 'uid', 'naam', 'postcode', 'gemeente', 'strftype', 'straat'
+
+    @property
+    def phonetic_attributes(self) -> tuple[str, ...]:
+        return 'naam', 'straat', 'gemeente'
+
+    @property
+    def phonetic_min_keys(self) -> dict[str, int]:
+        #korte straatwoorden (Oude Baan -> ad, bn) zouden bij elke query met die key op de cutoff komen
+        return {'straat': 5}
 
     def from_array(self, data_list: list[dict[str, Any]], *maps: dict[str, Any]) -> None:
         """Accepts a flat list of dictionaries representing Klant objects."""
+        #valideer alle rijksregisternummers in een keer
+        particulieren = [entry for entry in data_list if 'btwnummer' not in entry]
+        rrns = [str(entry.get('rijksregisternummer', '')).upper().strip() for entry in particulieren]
+        valid = iter(RRN.validate_many(rrns))
+        #en alle geslachten, bij een onbekende waarde parst from_dict per rij zoals voorheen
+        try:
+            geslachten: Iterator[Gender | None] = iter(Gender.parse_many(entry.get('geslacht', 'M') for entry in particulieren))
+        except ValueError:
+            geslachten = repeat(None)
         for entry in data_list:
             if 'btwnummer' in entry:
                 self.add(Professioneel.from_dict(entry))
             else:
-                self.add(Particulier.from_dict(entry))
+                self.add(Particulier.from_dict(entry, gevalideerd=bool(next(valid)), geslacht=next(geslachten)))
 
     def get_columns(self) -> tuple[str,...]:
         return "BTW/RRN", "Naam", "Straat", "Huisnummer", "Postcode", "Gemeente"
@@ -303,22 +894,29 @@ class KlantScribe(TypeScribe[Klant]):
             raise ValueError(f"Failed to find attribute {attr}")
         
         try:
-            #hydrate
-            if attr in ['huisnummer', 'postcode']:
-                value = int(value)
-            if attr == 'rijksregisternummer':
-                assert isinstance(obj, Particulier)
-                value = RRN(value) if RRN.isvalid(value) else RRN.generate(obj.geboortedatum,obj.geslacht=="M")
-            if attr == 'btwnummer':
-                assert isinstance(obj, Professioneel)
-                value = BTW(value) if BTW.isvalid(value) else BTW.generate()
-            if attr == 'geboortedatum':
-                value = date.fromisoformat(value)
+            value = self._hydrate(attr, value, obj)
             #set
-            setattr(obj, attr, value)
-            self.refresh(all=False)
+            self._apply(obj, attr, value)
+            self._updated([self._rows[id(obj)]], attr)
         except Exception as e:
             raise ValueError(f"Failed to set attribute: {e}")
+
+    @property
+    def unique_attributes(self) -> tuple[str, ...]:
+        return 'rijksregisternummer', 'btwnummer'
+
+    def _hydrate(self, attr: str, value: Any, obj: Klant | None = None) -> Any:
+        if attr in ['huisnummer', 'postcode']:
+            return int(value)
+        if attr == 'rijksregisternummer':
+            assert isinstance(obj, Particulier)
+            return RRN(value) if RRN.isvalid(value) else RRN.generate(obj.geboortedatum,obj.geslacht=="M")
+        if attr == 'btwnummer':
+            assert isinstance(obj, Professioneel)
+            return BTW(value) if BTW.isvalid(value) else BTW.generate()
+        if attr == 'geboortedatum':
+            return date.fromisoformat(value)
+        return value
         
     def create_default(self, obj_type: type=Particulier) -> Klant | None:
         if obj_type is Particulier:
@@ -338,8 +936,9 @@ class VoertuigScribe(TypeScribe[Voertuig]):
         return 'chassisnummer', 'merk', 'model', 'bouwjaar', 'categorie', 'status'
     
     def from_array(self, data_list: list[dict[str, Any]], *maps: dict[str, Any]) -> None:
-        for entry in data_list:
-            self.add(Voertuig.from_dict(entry))
+        categorieen = VoertuigCategorie.parse_many([entry.get('categorie', 'M1') for entry in data_list])
+        for entry, categorie in zip(data_list, categorieen):
+            self.add(Voertuig.from_dict(entry, categorie))
             
     def set_pricefilter(self, limit: int):
         dagprijs = RangeFilter('dagprijs', limit=limit)
@@ -364,26 +963,36 @@ class VoertuigScribe(TypeScribe[Voertuig]):
             raise ValueError(f"Failed to find attribute {attr}")
         
         try:
-            #hydrate
-            if attr == 'chassisnummer':
-                value = VIN(value) if VIN.isvalid(value) else VIN()
-            elif attr == 'bouwjaar':
-                value = Bouwjaar(value)
-            elif attr == 'categorie':
-                value = VoertuigCategorie.parse(value)
-            elif attr == 'dagprijs':
-                value = float(value)
-            elif attr == 'beschikbaar':
-                if isinstance(value, str):
-                    value = True if value.lower() in ('true', '1', 'yes', 'ja') else False
-                else:
-                    value = bool(value)
+            value = self._hydrate(attr, value, obj)
             #set
-            setattr(obj, attr, value)
-            self.refresh(all=False)
+            self._apply(obj, attr, value)
+            self._updated([self._rows[id(obj)]], attr)
         except Exception as e:
             raise ValueError(f"Failed to set attribute: {e}")
 
+    @property
+    def identifier(self) -> str:
+        return 'chassisnummer'
+
+    @property
+    def unique_attributes(self) -> tuple[str, ...]:
+        return 'chassisnummer',
+
+    def _hydrate(self, attr: str, value: Any, obj: Voertuig | None = None) -> Any:
+        if attr == 'chassisnummer':
+            return VIN(value) if VIN.isvalid(value) else VIN()
+        elif attr == 'bouwjaar':
+            return Bouwjaar(value)
+        elif attr == 'categorie':
+            return VoertuigCategorie.parse(value)
+        elif attr == 'dagprijs':
+            return float(value)
+        elif attr == 'beschikbaar':
+            if isinstance(value, str):
+                return True if value.lower() in ('true', '1', 'yes', 'ja') else False
+            return bool(value)
+        return value
+
     def create_default(self, obj_type: type=Voertuig) -> Voertuig | None:
         if obj_type is Voertuig:
             new_obj = Voertuig(VIN('00000000000000000'), '', '', Bouwjaar(1), VoertuigCategorie.M1, False, 0)
@@ -397,13 +1006,13 @@ class ReserveringScribe(TypeScribe[Reservering]):
     def window_state(self) -> list[str]:
         '''returns window state as uids'''
         uids: list[str] = []
-        for fuzzable in self._window:
-            assert isinstance(fuzzable.obj, Reservering)
-            if fuzzable.obj.uid:
-                assert fuzzable.obj.klant.uid and fuzzable.obj.voertuig.uid
-                uids.append(fuzzable.obj.uid) 
-                uids.append(fuzzable.obj.klant.uid)
-                uids.append(fuzzable.obj.voertuig.uid)
+        for obj in self:
+            assert isinstance(obj, Reservering)
+            if obj.uid:
+                assert obj.klant.uid and obj.voertuig.uid
+                uids.append(obj.uid) 
+                uids.append(obj.klant.uid)
+                uids.append(obj.voertuig.uid)
         return uids
         
     @property
@@ -414,9 +1023,11 @@ class ReserveringScribe(TypeScribe[Reservering]):
         map_klant: dict[str, ReferenceType[Klant]] = next(m for m in maps if m and isinstance(next(iter(m.values()))(), Klant))
         map_voertuig: dict[str, ReferenceType[Voertuig]] = next(m for m in maps if m and isinstance(next(iter(m.values()))(), Voertuig))
 
-        prefix_today = date.today().strftime("%y%m%d")
-        max_num = 0
-
+        #synchroniseer generator met auto-generated nummers van vandaag, daarna de ontbrekende nummers in een keer
+        for dry in data_list:
+            if 'nummer' in dry:
+                RESERVATIE_NUMMER.observe(dry['nummer'])
+        nummers = iter(RESERVATIE_NUMMER.allocate(sum('nummer' not in dry for dry in data_list)))
         for dry in data_list:
             # Hydrate met objects
             moist = dry.copy()
@@ -426,28 +1037,35 @@ class ReserveringScribe(TypeScribe[Reservering]):
             #assign deref obj
             moist['klant'] = map_klant[uid_k]()
             moist['voertuig'] = map_voertuig[uid_v]()
+            if 'nummer' not in dry:
+                moist['nummer'] = next(nummers)
             #add reservatie
-            reservatie = Reservering.from_dict(moist)
-            self.add(reservatie)
-            #controleer auto-generated nummers
-            if reservatie.nummer.startswith(prefix_today):
-                res_num = int(reservatie.nummer[-3:])
-                max_num = max(max_num, res_num)
-        #synchroniseer generator
-        for _ in range(max_num):
-            next(RESERVATIE_NUMMER)
+            self.add(Reservering.from_dict(moist))
             
+    def _searchable(self, objects: list[Reservering | None]) -> list[Any]:
+        #afgeleide waarden in een keer i.p.v. een property per kolom
+        return [obj.afgeleid if obj is not None else None for obj in objects]
+
+    def _reindex_related(self, rows: np.ndarray) -> None:
+        #klant of voertuig gewijzigd: de afgeleide waarden van deze reserveringen kloppen niet meer
+        for row in rows.tolist():
+            obj = self._objects.get(row)
+            if obj is not None:
+                obj.invalideer()
+        super()._reindex_related(rows)
+
     def get_columns(self) -> tuple[str, ...]:
         return "Nummer", "Klant", "Merk", "Model", "Van", "Tot", "Status"
     
     def _format_row(self, obj: Reservering) -> list[str]:
-        return [obj.uid if obj.uid is not None else 'None', 
-                obj.strfklant, 
-                obj.strfmerk, 
-                obj.strfmodel, 
+        a = obj.afgeleid
+        return [a.uid if a.uid is not None else 'None', 
+                a.strfklant, 
+                a.strfmerk, 
+                a.strfmodel, 
                 str(obj.van), 
                 str(obj.tot), 
-                obj.status.capitalize()]
+                a.status.capitalize()]
     
     def update(self, obj: Reservering | int, attr: str, value: Any):
         """Update a field with validation"""
@@ -459,35 +1077,70 @@ class ReserveringScribe(TypeScribe[Reservering]):
             raise ValueError(f"Failed to find attribute {attr}")
         
         try:
-            if isinstance(value, str):
-                #hydrate
-                if attr == 'van' or attr == 'tot':
-                    value = date.fromisoformat(value)
-                elif attr == 'ingeleverd':
-                    if value.lower() in ('true', '1', 'yes', 'ja'):
-                        value = True 
-                    elif value.lower() in ('false', '0', 'no', 'nee', 'neen'):
-                        value = False
-                    else:
-                        value = date.fromisoformat(value)
-            #validate date logic
-            if attr == 'van' and hasattr(obj, 'tot'):
-                if isinstance(value, date) and value > obj.tot:
-                    raise ValueError("Start date cannot be after end date")
-            elif attr == 'tot' and hasattr(obj, 'van'):
-                if isinstance(value, date) and value < obj.van:
-                    raise ValueError("End date cannot be before start date")
-            #set
-            setattr(obj, attr, value)
-            self.refresh(all=False)
-            #update voertuig
+            value = self._hydrate(attr, value, obj)
+            self._validate(obj, attr, value)
+            #set (en update voertuig)
+            self._assign(obj, attr, value)
+            self._updated([self._rows[id(obj)]], attr)
             if attr == 'ingeleverd':
-                obj.voertuig.beschikbaar = bool(value)
                 raise RuntimeError
         except RuntimeError:
             raise RuntimeError("Voertuig uit/ingeleverd in verkeerde workflow")
         except Exception as e:
             raise ValueError(f"Failed to set attribute: {e}")
+
+    @property
+    def unique_attributes(self) -> tuple[str, ...]:
+        return 'nummer',
+
+    @property
+    def relations(self) -> tuple[str, ...]:
+        return 'klant', 'voertuig'
+
+    def by_klant(self, klant: Klant) -> list[Reservering]:
+        """Reservations of a klant, O(k)."""
+        return self.related('klant', klant)
+
+    def by_voertuig(self, voertuig: Voertuig) -> list[Reservering]:
+        """Reservations of a voertuig, O(k)."""
+        return self.related('voertuig', voertuig)
+
+    def _hydrate(self, attr: str, value: Any, obj: Reservering | None = None) -> Any:
+        if isinstance(value, str):
+            if attr == 'van' or attr == 'tot':
+                return date.fromisoformat(value)
+            elif attr == 'ingeleverd':
+                if value.lower() in ('true', '1', 'yes', 'ja'):
+                    return True 
+                elif value.lower() in ('false', '0', 'no', 'nee', 'neen'):
+                    return False
+                return date.fromisoformat(value)
+        return value
+
+    def _validate(self, obj: Reservering, attr: str, value: Any) -> None:
+        #validate date logic
+        if attr == 'van' and hasattr(obj, 'tot'):
+            if isinstance(value, date) and value > obj.tot:
+                raise ValueError("Start date cannot be after end date")
+        elif attr == 'tot' and hasattr(obj, 'van'):
+            if isinstance(value, date) and value < obj.van:
+                raise ValueError("End date cannot be before start date")
+
+    def _apply(self, obj: Reservering, attr: str, value: Any) -> None:
+        super()._apply(obj, attr, value)
+        if attr == 'ingeleverd':
+            voertuigen = self._sources.get('voertuig')
+            if voertuigen is not None:
+                voertuigen._apply(obj.voertuig, 'beschikbaar', bool(value))
+            else:
+                obj.voertuig.beschikbaar = bool(value)
+
+    def _updated(self, rows: list[int], attr: str) -> None:
+        super()._updated(rows, attr)
+        #ingeleverd zet ook de beschikbaarheid van het voertuig
+        voertuigen = self._sources.get('voertuig')
+        if attr == 'ingeleverd' and voertuigen is not None:
+            voertuigen._touched(self._objects[row].voertuig for row in rows)
         
     def create_default(self, obj_type: type=Reservering) -> Reservering | None:
         if obj_type is Reservering:
@@ -517,13 +1170,17 @@ class FactuurScribe(TypeScribe[Factuur]):
             #add reservatie
             self.add(Factuur.from_dict(moist))
 
+    def _searchable(self, objects: list[Factuur | None]) -> list[Any]:
+        return [obj.afgeleid if obj is not None else None for obj in objects]
+
     def get_columns(self) -> tuple[str, ...]:
         return "Nummer", "Klant", "Voertuig", "Bedrag"
     
     def _format_row(self, obj: Factuur) -> list[str]:
-        return [obj.uid if obj.uid is not None else 'None', 
-                obj.strfklant, 
-                f"{obj.strfmerk} {obj.strfmodel}", 
+        a = obj.afgeleid
+        return [a.uid if a.uid is not None else 'None', 
+                a.strfklant, 
+                f"{a.strfmerk} {a.strfmodel}", 
                 f"{obj.bedrag:.2f}"]
     
     def update(self, obj: Factuur | int, attr: str, value: Any):
@@ -537,16 +1194,76 @@ class FactuurScribe(TypeScribe[Factuur]):
         
         try:
             if isinstance(value, str) or attr == 'bedrag':
-                #hydrate
-                value = float(value)
                 #set
-                setattr(obj, attr, value)
+                self._apply(obj, attr, self._hydrate(attr, value, obj))
             elif isinstance(value, Reservering) and attr == 'reservering':
                 #set
-                obj.reservering, obj.bedrag = Factuur.finalize_reservatie(value)
-            self.refresh(all=False)
+                self._assign(obj, attr, value)
+            self._updated([self._rows[id(obj)]], attr)
         except Exception as e:
             raise ValueError(f"Failed to set attribute: {e}")
+
+    @property
+    def unique_attributes(self) -> tuple[str, ...]:
+        return 'reservering',
+
+    @property
+    def relations(self) -> tuple[str, ...]:
+        return 'reservering',
+
+    def bill_many(self, reservaties: Iterable[Reservering], inleverdata: date | Iterable[date | None] | None = None) -> list[Factuur]:
+        """
+        Bill many reservations at once, like Factuur.from_finalize_reservatie.
+        inleverdata: one date for all, a date (or None = on time) per reservation, or None.
+        Amounts are computed with NumPy: dagprijs * duur + 2 * dagprijs * dagen te laat.
+        Reservations that already have a factuur are skipped. Returns the new facturen.
+        """
+        reservaties = list(reservaties)
+        if inleverdata is None or isinstance(inleverdata, date):
+            inleverdata = [inleverdata] * len(reservaties)
+        todo = [(r, d) for r, d in zip(reservaties, inleverdata, strict=True) if self.by_reservering(r) is None]
+        if not todo:
+            return []
+        n = len(todo)
+        dagprijs = np.fromiter((r.voertuig.dagprijs for r, _ in todo), dtype=np.float64, count=n)
+        van = np.array([r.van for r, _ in todo], dtype='datetime64[D]')
+        tot = np.array([r.tot for r, _ in todo], dtype='datetime64[D]')
+        ingeleverd = np.array([d if d is not None else r.tot for r, d in todo], dtype='datetime64[D]')
+        duur = (tot - van).astype(np.int64) + 1
+        telaat = np.maximum((ingeleverd - tot).astype(np.int64), 0)
+        bedrag = dagprijs * duur + (dagprijs * telaat) * 2
+        facturen: list[Factuur] = []
+        for (r, _), b in zip(todo, bedrag.tolist()):
+            factuur = Factuur(r, b, afgerekend=True)
+            self.add(factuur)
+            facturen.append(factuur)
+        #inleveren via de reserveringen scribe: _apply zet ook het voertuig beschikbaar, daarna een keer herindexeren
+        changes = [(r, d if late else True) for (r, d), late in zip(todo, (telaat > 0).tolist())]
+        reserveringen = self._sources.get('reservering')
+        if reserveringen is not None:
+            reserveringen._apply_many(changes, 'ingeleverd')
+        else:
+            #losse FactuurScribe zonder reserveringen
+            for r, ingeleverd in changes:
+                r.ingeleverd = ingeleverd
+                r.voertuig.beschikbaar = True
+        return facturen
+
+    def by_reservering(self, reservering: Reservering) -> Factuur | None:
+        """The factuur of a reservering, O(1)."""
+        facturen = self.related('reservering', reservering)
+        return facturen[0] if facturen else None
+
+    def _apply(self, obj: Factuur, attr: str, value: Any) -> None:
+        if attr == 'reservering' and isinstance(value, Reservering):
+            obj.reservering, obj.bedrag = Factuur.finalize_reservatie(value)
+        else:
+            super()._apply(obj, attr, value)
+
+    def _hydrate(self, attr: str, value: Any, obj: Factuur | None = None) -> Any:
+        if isinstance(value, str) or attr == 'bedrag':
+            return float(value)
+        return value
         
     def create_default(self, obj_type: type=Factuur) -> Factuur | None:
         if obj_type is Factuur:
@@ -635,8 +1352,8 @@ class CompoundFilter(ObjectFilter):
         return all(f.matches(obj) for f in self.filters)
         
 class UIDFilter(ObjectFilter):
-    def __init__(self, uids: list[str]):
-        self.uids = uids
+    def __init__(self, uids: Iterable[str]):
+        self.uids = frozenset(uids)
     
     def matches(self, obj: Any) -> bool:
         if not hasattr(obj, 'uid'):
@@ -644,6 +1361,17 @@ class UIDFilter(ObjectFilter):
         value = getattr(obj, 'uid')
         return value in self.uids
     
+class RelatedFilter(ObjectFilter):
+    """Objects of scribe whose attr references target, looked up by row in the scribe's reverse index"""
+    def __init__(self, scribe: 'TypeScribe[Any]', attr: str, target: Any):
+        self.scribe = scribe
+        self.attr = attr
+        self.target = target
+
+    def matches(self, obj: Any) -> bool:
+        rows = self.scribe._related[self.attr].get(id(self.target), ())
+        return self.scribe._rows.get(id(obj)) in rows
+
 class ReservatiemaandFilter(ObjectFilter):
     
     def __init__(self, month: int):
@@ -658,4 +1386,51 @@ class ReservatiemaandFilter(ObjectFilter):
             return True
         if obj.tot.month == self.month:
             return True
-        return False
\ No newline at end of file
+        return False
+
+#een worker per scribe, trage zoekopdrachten lopen verder zonder de volgende te blokkeren
+_SEARCH_POOL: ThreadPoolExecutor | None = None
+#generatie van de laatste global_search, workers van een oudere stoppen
+_SEARCH_GENERATION = 0
+
+def _search_job(generation: int, scribe: TypeScribe[Any], query: str, limit: int) -> list[tuple[float, int, int]]:
+    """scribe.search in a worker, dropped as soon as a newer global_search started or the budget ran out."""
+    stale = lambda: generation != _SEARCH_GENERATION
+    return [] if stale() else scribe.search(query, limit, stale)
+
+def global_search(scribes: Iterable[TypeScribe[Any]], query: str, limit: int = 20, budget: float = 0.25) -> tuple[list[GlobalHit], list[str]]:
+    """
+    Search several scribes at once and merge the hits into one ranked list.
+    Every scribe is searched in a thread pool (the fuzzy scoring releases the GIL); scribes that don't answer
+    within budget seconds are left out and their jobs cancelled, so a fast typist doesn't queue up old queries.
+    Returns the hits and the entity types that were too slow.
+    """
+    global _SEARCH_POOL, _SEARCH_GENERATION
+    if _SEARCH_POOL is None:
+        _SEARCH_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="global_search")
+    _SEARCH_GENERATION += 1
+    generation = _SEARCH_GENERATION
+    futures = {}
+    for scribe in scribes:
+        #nieuwe objecten en secundaire indexes op deze thread, de workers lezen enkel
+        scribe.prepare_search(query)
+        futures[_SEARCH_POOL.submit(_search_job, generation, scribe, query, limit)] = scribe
+    done, pending = wait(futures, timeout=budget)
+    if pending:
+        #wachtende jobs vallen weg, lopende stoppen bij hun volgende batch en geven de index lock vrij
+        for future in pending:
+            future.cancel()
+        _SEARCH_GENERATION += 1
+    hits: list[GlobalHit] = []
+    #in de volgorde van scribes, zodat gelijke scores stabiel blijven
+    for future, scribe in futures.items():
+        if future not in done:
+            continue
+        entity = scribe.__class__.__name__.replace('Scribe', '')
+        for score, row, match in future.result():
+            obj = scribe._objects.get(row)
+            if obj is not None:
+                hits.append(GlobalHit(score, entity, scribe, obj, scribe._index.match(row, match)))
+    hits.sort(key=lambda hit: hit.score, reverse=True)
+    slow = [futures[future].__class__.__name__.replace('Scribe', '') for future in pending]
+    return hits[:limit], slow
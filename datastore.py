@@ -1,6 +1,7 @@
 import json
 from pathlib import Path
-from datamodel import Particulier, Professioneel
+from dataclasses import fields
+from datamodel import Particulier, Professioneel, RESERVATIE_NUMMER
 from datascrivener import KlantScribe, VoertuigScribe, ReserveringScribe, FactuurScribe
 from typing import Any
 
@@ -9,6 +10,10 @@ klanten = KlantScribe()
 voertuigen = VoertuigScribe()
 reserveringen = ReserveringScribe()
 facturen = FactuurScribe()
+#wijzigingen aan klanten, voertuigen en reserveringen herindexeren de rows die ernaar verwijzen
+reserveringen.watch(klanten, 'klant')
+reserveringen.watch(voertuigen, 'voertuig')
+facturen.watch(reserveringen, 'reservering')
 
 DATA_FILE = "data.json"
 TEST_FILE = "test.json"
@@ -37,15 +42,22 @@ def read_data():
 
     reserveringen.clear()
     reserveringen.from_array(reserveringen_data, klanten.uids, voertuigen.uids)
+    teller = json_data.get('reservatie_nummer')
+    if isinstance(teller, dict):
+        RESERVATIE_NUMMER.sync(str(teller.get('dag', '')), int(teller.get('volgnummer', 0)))
     
     facturen.clear()
     facturen.from_array(facturen_data, reserveringen.uids)
 
+def _record(obj: Any) -> dict[str, Any]:
+    """Shallow field dict of a dataclass, vars() werkt niet op slots."""
+    return {f.name: getattr(obj, f.name) for f in fields(obj)}
+
 def save_data():
     data = {
-        "particulier": [vars(k) for k in klanten.all if isinstance(k, Particulier)],
-        "professioneel": [vars(k) for k in klanten.all if isinstance(k, Professioneel)],
-        "voertuigen": [vars(v) for v in voertuigen.all],
+        "particulier": [_record(k) for k in klanten.all if isinstance(k, Particulier)],
+        "professioneel": [_record(k) for k in klanten.all if isinstance(k, Professioneel)],
+        "voertuigen": [_record(v) for v in voertuigen.all],
         "reserveringen": [{
             "nummer": r.nummer,
             "klant": r.klant.uid,
@@ -57,7 +69,8 @@ def save_data():
         "facturen": [{
             "reservering": f.uid,
             "bedrag": f.bedrag
-        } for f in facturen.all]
+        } for f in facturen.all],
+        "reservatie_nummer": RESERVATIE_NUMMER.state,
     }
     with open(DATA_FILE, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=4, default=str)
@@ -0,0 +1,204 @@
+"""
+Hot-path instrumentation and memory accounting for the scribes.
+A scribe only records when it holds a HotPathStats object, so disabled stats cost one None check per phase.
+"""
+import sys
+import tracemalloc
+import weakref
+from dataclasses import dataclass, field, is_dataclass
+from enum import Enum
+from time import perf_counter_ns
+from typing import Any
+
+class PhaseStats:
+    """Call counter, item counter and log2 timing histogram (in μs) for one phase."""
+    __slots__ = ('calls', 'items', 'total_ns', 'max_ns', 'buckets')
+
+    def __init__(self):
+        self.calls: int = 0
+        self.items: int = 0
+        self.total_ns: int = 0
+        self.max_ns: int = 0
+        self.buckets: list[int] = [0] * 40
+
+    def record(self, ns: int, items: int = 1) -> None:
+        self.calls += 1
+        self.items += items
+        self.total_ns += ns
+        self.max_ns = max(self.max_ns, ns)
+        #bucket i: [2^(i-1), 2^i) μs
+        self.buckets[min(int(ns // 1000).bit_length(), len(self.buckets) - 1)] += 1
+
+    def percentile(self, p: float) -> float:
+        """Upper bound (μs) of the histogram bucket holding the p-th percentile."""
+        if not self.calls:
+            return 0
+        target, seen = p * self.calls, 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target:
+                return float(2 ** i)
+        return self.max_ns / 1000
+
+    @property
+    def mean_us(self) -> float:
+        return self.total_ns / self.calls / 1000 if self.calls else 0
+
+class HotPathStats:
+    """
+    Counters and timing histograms per hot-path phase of a TypeScribe:
+    filter evaluation, search index construction, fuzz scoring, sorting and row formatting.
+    """
+    PHASES: tuple[str, ...] = ('filter', 'index', 'fuzz', 'sort', 'format')
+
+    def __init__(self):
+        self.phases: dict[str, PhaseStats] = {phase: PhaseStats() for phase in self.PHASES}
+        self.counters: dict[str, int] = {}
+
+    @staticmethod
+    def start() -> int:
+        return perf_counter_ns()
+
+    def record(self, phase: str, start_ns: int, items: int = 1) -> None:
+        """Record the time since start_ns for a phase, covering `items` objects."""
+        if phase not in self.phases:
+            self.phases[phase] = PhaseStats()
+        self.phases[phase].record(perf_counter_ns() - start_ns, items)
+
+    def count(self, counter: str, n: int = 1) -> None:
+        self.counters[counter] = self.counters.get(counter, 0) + n
+
+    def reset(self) -> None:
+        self.phases = {phase: PhaseStats() for phase in self.PHASES}
+        self.counters.clear()
+
+    def snapshot(self) -> dict[str, Any]:
+        """Plain dict of all phases and counters, for logging or JSON."""
+        return {
+            "phases": {name: {
+                "calls": s.calls,
+                "items": s.items,
+                "total_ms": s.total_ns / 1e6,
+                "mean_us": s.mean_us,
+                "p50_us": s.percentile(0.5),
+                "p95_us": s.percentile(0.95),
+                "max_us": s.max_ns / 1000,
+            } for name, s in self.phases.items()},
+            "counters": dict(self.counters),
+        }
+
+# --- Memory ---
+
+def _deep_size(obj: Any, seen: set[int], root: Any = None) -> int:
+    """
+    sys.getsizeof over obj and everything it owns, counting every object once (seen).
+    Other dataclass instances than root, enum members and types are shared, so they are not followed.
+    """
+    size = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        size += sys.getsizeof(o)
+        if isinstance(o, (str, bytes, int, float, bool)) or o is None:
+            continue
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+        #volg attributen van root (of gewone objecten), niet van gedeelde objecten
+        if o is root or not (is_dataclass(o) or isinstance(o, (Enum, type, weakref.ReferenceType))):
+            if hasattr(o, '__dict__'):
+                stack.append(vars(o))
+            for cls in type(o).__mro__:
+                slots = getattr(cls, '__slots__', ())
+                for slot in (slots,) if isinstance(slots, str) else slots:
+                    if slot not in ('__dict__', '__weakref__') and hasattr(o, slot):
+                        stack.append(getattr(o, slot))
+    return size
+
+@dataclass
+class MemoryReport:
+    """Bytes held by one scribe, split by owner."""
+    scribe: str
+    objects: int
+    object_bytes: int
+    index_bytes: dict[str, int] = field(default_factory=dict)
+    window_bytes: int = 0
+    hidden_bytes: int = 0
+    rebuild_peak_bytes: int | None = None
+
+    @property
+    def total_bytes(self) -> int:
+        return self.object_bytes + sum(self.index_bytes.values()) + self.window_bytes + self.hidden_bytes
+
+    @property
+    def bytes_per_object(self) -> float:
+        return self.total_bytes / self.objects if self.objects else 0
+
+    def summary(self) -> str:
+        """One line: total and bytes per object per owner."""
+        if not self.objects:
+            return f"{self.scribe}: geen objecten"
+        parts = {"obj": self.object_bytes, **self.index_bytes, "view": self.window_bytes + self.hidden_bytes}
+        detail = " ".join(f"{name} {n/self.objects:,.0f}" for name, n in parts.items())
+        return f"{self.scribe}: {self.total_bytes/1024:,.1f} KiB, {self.bytes_per_object:,.0f} B/obj ({detail})"
+
+    def lines(self) -> list[str]:
+        """Human readable summary, one line per owner."""
+        per = lambda n: f"{n/self.objects:,.0f} B/obj" if self.objects else "-"
+        lines = [
+            f"{self.scribe}: {self.objects} objecten, {self.total_bytes/1024:,.1f} KiB ({per(self.total_bytes)})",
+            f"  dataclasses   {self.object_bytes/1024:>10,.1f} KiB  {per(self.object_bytes)}",
+        ]
+        for name, n in self.index_bytes.items():
+            lines.append(f"  index {name:<8}{n/1024:>10,.1f} KiB  {per(n)}")
+        lines.append(f"  _window       {self.window_bytes/1024:>10,.1f} KiB")
+        lines.append(f"  _hidden       {self.hidden_bytes/1024:>10,.1f} KiB")
+        if self.rebuild_peak_bytes is not None:
+            lines.append(f"  rebuild peak  {self.rebuild_peak_bytes/1024:>10,.1f} KiB (tracemalloc)")
+        return lines
+
+def memory_report(scribe: Any, trace: bool = False) -> MemoryReport:
+    """
+    Memory accounting of a TypeScribe by walking its objects with sys.getsizeof.
+    Strings shared between owners are counted for the first owner (dataclasses before indexes).
+    trace: also measure the allocation peak of rebuilding the view with tracemalloc. This really rebuilds it
+    (refresh, the filter and query are kept), seconds at a million rows, so only on explicit request.
+    """
+    seen: set[int] = set()
+    objects = scribe.all
+    object_bytes = sum(_deep_size(obj, seen, root=obj) for obj in objects)
+
+    index_bytes = {name: _deep_size(index, seen) for name, index in scribe.indexes.items()}
+
+    report = MemoryReport(
+        scribe=scribe.__class__.__name__.replace('Scribe', ''),
+        objects=len(objects),
+        object_bytes=object_bytes,
+        index_bytes=index_bytes,
+        #rows, scores en gematchte kolommen van de view
+        window_bytes=scribe._window.nbytes + scribe._scores.nbytes + scribe._matches.nbytes,
+        hidden_bytes=scribe._hidden.nbytes,
+    )
+    if trace:
+        report.rebuild_peak_bytes = _rebuild_peak(scribe)
+    return report
+
+def _rebuild_peak(scribe: Any) -> int:
+    """Allocation peak (tracemalloc) of reindexing and recomputing the current view, filter and query included."""
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        scribe.refresh(all=False)
+        _, peak = tracemalloc.get_traced_memory()
+        return peak - before
+    finally:
+        if started:
+            tracemalloc.stop()
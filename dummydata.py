@@ -1,108 +1,271 @@
-from datamodel import *
-from _old_datastore import *
-from datetime import timedelta
-
-def generate_dummy_klanten(count: int = 10):
-    jongensnamen = [
-        "Jan", "Marc", "Luc", "Jean", "Pierre", "Dieter", "Hans", "Dirk", "Stijn", "Koen",
-        "Thomas", "Bram", "Jeroen", "Niels", "Wout", "Arne", "Gilles", "Laurent", "Benoît", "Olivier",
-        "Matthias", "Sven", "Ruben", "Maarten", "Florian", "Pascal", "Guillaume", "Christophe", "Lars", "Tobias"
-    ]
-    meisjesnamen = [
-        "An", "Marie", "Isabelle", "Petra", "Elena", "Karin", "Sofie", "Katrijn", "Monique",
-        "Emma", "Lotte", "Hanne", "Julie", "Charlotte", "Nathalie", "Claire", "Aline", "Chloé",
-        "Ingrid", "Sabine", "Martine", "Leonie", "Marlies", "Eva", "Sarah", "Noémie"
-    ]
-    familienamen = [
-        "Peeters", "Janssens", "Maes", "Willems", "Mertens", "Dubois", "Lambert", "Müller", "Schneider", "Hendrix",
-        "Claes", "Goossens", "De Smet", "Vermeulen", "Jacobs", "Lefevre", "Moreau", "Weber", "Fischer", "Beckers",
-        "Dupont", "Girard", "Keller", "Schmidt", "Kraus", "Bauer", "Bernard", "Rousseau", "Huber", "Vandenberghe"
-    ]
-    activiteiten = [
-        "Logistics", "Solutions", "Security", "Schilderwerken", "Tuinonderhoud", 
-        "Dakwerken", "Sanitair", "Elektriciteitswerken", "Renovaties", "Verhuisservice"
-        ]
-    gemeentes = [
-        ("Hasselt", 3500), ("Genk", 3600), ("Maasmechelen", 3630), ("Tongeren", 3700), ("Lommel", 3920), 
-        ("Beringen", 3580), ("Sint-Truiden", 3800), ("Maaseik", 3680), ("Diepenbeek", 3590), ("Zonhoven", 3520), 
-        ("Heusden-Zolder", 3550), ("Houthalen-Helchteren", 3530), ("Bilzen", 3740), ("Lanaken", 3620), ("Dilsen-Stokkem", 3650), 
-        ("Leopoldsburg", 3970), ("Peer", 3990), ("Nieuwerkerken", 3850), ("Wellen", 3830), ("Kinrooi", 3640)]
-    
-    for i in range(count):
-        plaatsnaam, pc = gemeentes[np.random.randint(0,len(gemeentes))]
-        achternaam = np.random.choice(familienamen)
-        activiteit = np.random.choice(activiteiten)
-        
-        if np.random.choice([True, False]): # Male
-            voornaam = np.random.choice(jongensnamen)
-            geslacht = "M"
-        else: # Female
-            voornaam = np.random.choice(meisjesnamen)
-            geslacht = "V"
-        
-        if i % 3 == 0: # 1/3 Professioneel
-            lijst_klanten.append(Professioneel(
-                naam=f"{voornaam[0]}. {achternaam} {activiteit}", 
-                straat="Industrieweg", 
-                huisnummer=np.random.randint(1, 200), 
-                postcode=pc, 
-                gemeente=plaatsnaam, 
-                btwnummer=BTW()
-            ))
-        else:
-            lijst_klanten.append(Particulier(
-                naam=f"{voornaam} {achternaam}", 
-                straat="Dorpsstraat", 
-                huisnummer=np.random.randint(1, 150), 
-                postcode=pc, 
-                gemeente=plaatsnaam, 
-                geslacht=geslacht, 
-                geboortedatum=date(1970, 1, 1) + timedelta(days=np.random.randint(0, 12345))
-        ))
-
-def generate_dummy_vloot(tries: int = 2):
-    wagens = { # [N1, M1, M1, M1]
-        "Mercedes-Benz": ["Vito", "A-Klasse", "C-Klasse", "CLA"],
-        "Renault": ["Master", "Clio", "Megane", "Captur"],
-        "Opel": ["Vivaro", "Corsa", "Astra", "Mokka"],
-        "Ford": ["Transit", "Fiesta", "Focus", "Mondeo"],
-        "Volkswagen": ["Crafter", "Golf", "Polo", "Passat"],
-        "Peugeot": ["Partner", "208", "308", "508"],
-        "Toyota": ["Proace", "Corolla", "Yaris", "RAV4"],
-        "BMW": [None, "1-Reeks", "3-Reeks", "i3"]
-        }
-    
-    for merk, modellen in wagens.items():
-        for i, model in enumerate(modellen):
-            cat: VoertuigCategorie = "N1" if i == 0 else "M1"
-            for _ in range(tries):
-                if np.random.choice([True, False]) and model is not None:
-                    lijst_voertuigen.append(Voertuig(
-                        chassisnummer=VIN(),
-                        merk=merk,
-                        model=model,
-                        bouwjaar=Bouwjaar(np.random.randint(2017, 2025)),
-                        categorie=cat,
-                        dagprijs=round(np.random.uniform(45.0, 95.0) if cat == "N1" else np.random.uniform(32.0, 65.0), 2)
-                    ))
-
-def generate_dummy_reservaties(count: int = 10):
-    start_period, end_period = date(2025, 9, 1), date(2025, 11, 30)
-    delta_days = (end_period - start_period).days
-    klanten = lijst_klanten.copy()
-    voertuigen = lijst_voertuigen.copy()
-    for _ in range(count):
-        i, j = np.random.randint(0, len(klanten)), np.random.randint(0, len(voertuigen))
-        k, v = klanten.pop(i), voertuigen.pop(j)
-        d_start = start_period + timedelta(days=np.random.randint(0, delta_days - 7))
-        d_end = d_start + timedelta(days=np.random.randint(1, 7))
-        re = np.random.choice([True, False])
-        v.beschikbaar = True if re else False
-        res = Reservering(klant=k, voertuig=v, van=d_start, tot=d_end, ingeleverd=re)
-        lijst_reserveringen.append(res)
+"""
+Seedable bulk generator for load-test data.
+Tables are built column-wise with NumPy and written straight into the datastore JSON schema.
+"""
+import json
+from datetime import date
+from pathlib import Path
+from typing import Any, Iterator
+import numpy as np
+from datamodel import VIN, RRN, BTW
+from datastore import TEST_FILE
+
+type Columns = dict[str, np.ndarray]
+
+JONGENSNAMEN = [
+    "Jan", "Marc", "Luc", "Jean", "Pierre", "Dieter", "Hans", "Dirk", "Stijn", "Koen",
+    "Thomas", "Bram", "Jeroen", "Niels", "Wout", "Arne", "Gilles", "Laurent", "Benoît", "Olivier",
+    "Matthias", "Sven", "Ruben", "Maarten", "Florian", "Pascal", "Guillaume", "Christophe", "Lars", "Tobias"
+]
+MEISJESNAMEN = [
+    "An", "Marie", "Isabelle", "Petra", "Elena", "Karin", "Sofie", "Katrijn", "Monique",
+    "Emma", "Lotte", "Hanne", "Julie", "Charlotte", "Nathalie", "Claire", "Aline", "Chloé",
+    "Ingrid", "Sabine", "Martine", "Leonie", "Marlies", "Eva", "Sarah", "Noémie"
+]
+FAMILIENAMEN = [
+    "Peeters", "Janssens", "Maes", "Willems", "Mertens", "Dubois", "Lambert", "Müller", "Schneider", "Hendrix",
+    "Claes", "Goossens", "De Smet", "Vermeulen", "Jacobs", "Lefevre", "Moreau", "Weber", "Fischer", "Beckers",
+    "Dupont", "Girard", "Keller", "Schmidt", "Kraus", "Bauer", "Bernard", "Rousseau", "Huber", "Vandenberghe"
+]
+ACTIVITEITEN = [
+    "Logistics", "Solutions", "Security", "Schilderwerken", "Tuinonderhoud",
+    "Dakwerken", "Sanitair", "Elektriciteitswerken", "Renovaties", "Verhuisservice"
+]
+STRATEN = ["Dorpsstraat", "Kerkstraat", "Stationsstraat", "Molenstraat", "Schoolstraat", "Nieuwstraat", "Kapelstraat", "Kiezelweg"]
+BEDRIJFSSTRATEN = ["Industrieweg", "Ambachtsweg", "Nijverheidslaan", "Kanaalweg"]
+GEMEENTES = [
+    ("Hasselt", 3500), ("Genk", 3600), ("Maasmechelen", 3630), ("Tongeren", 3700), ("Lommel", 3920),
+    ("Beringen", 3580), ("Sint-Truiden", 3800), ("Maaseik", 3680), ("Diepenbeek", 3590), ("Zonhoven", 3520),
+    ("Heusden-Zolder", 3550), ("Houthalen-Helchteren", 3530), ("Bilzen", 3740), ("Lanaken", 3620), ("Dilsen-Stokkem", 3650),
+    ("Leopoldsburg", 3970), ("Peer", 3990), ("Nieuwerkerken", 3850), ("Wellen", 3830), ("Kinrooi", 3640)]
+WAGENS = { # [N1, M1, M1, M1]
+    "Mercedes-Benz": ["Vito", "A-Klasse", "C-Klasse", "CLA"],
+    "Renault": ["Master", "Clio", "Megane", "Captur"],
+    "Opel": ["Vivaro", "Corsa", "Astra", "Mokka"],
+    "Ford": ["Transit", "Fiesta", "Focus", "Mondeo"],
+    "Volkswagen": ["Crafter", "Golf", "Polo", "Passat"],
+    "Peugeot": ["Partner", "208", "308", "508"],
+    "Toyota": ["Proace", "Corolla", "Yaris", "RAV4"],
+    "BMW": [None, "1-Reeks", "3-Reeks", "i3"]
+    }
+
+GEBOORTE_VAN, GEBOORTE_TOT = np.datetime64('1940-01-01'), np.datetime64('2007-01-01')
+
+def _pick(rng: np.random.Generator, choices: list[str], n: int) -> np.ndarray:
+    return np.array(choices)[rng.integers(0, len(choices), size=n)]
+
+def _join(*parts: np.ndarray | str) -> np.ndarray:
+    result = np.asarray(parts[0])
+    for part in parts[1:]:
+        result = np.char.add(result, part)
+    return result
+
+def _group_starts(keys: np.ndarray) -> np.ndarray:
+    """For sorted keys, the index of the first row of each row's group."""
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    return starts[np.searchsorted(starts, np.arange(len(keys)), side='right') - 1]
+
+def _cap_per_day(dagen: np.ndarray, cap: int) -> np.ndarray:
+    """Move rows of days with more than cap rows to the days before, never later. Returns the new day per row."""
+    if not len(dagen):
+        return dagen.copy()
+    volgorde = np.argsort(dagen, kind='stable')
+    dag, aantal = np.unique(dagen.astype(np.int64), return_counts=True)
+    per_dag = dict(zip(dag.tolist(), aantal.tolist()))
+    #van de laatste dag terug: wat niet past schuift een dag op
+    dagnummers: list[int] = []
+    genomen: list[int] = []
+    d, over = int(dag[-1]), 0
+    while d >= dag[0] or over:
+        n = per_dag.get(d, 0) + over
+        dagnummers.append(d)
+        genomen.append(min(n, cap))
+        over = n - genomen[-1]
+        d -= 1
+    #gesorteerde rows vullen de dagen op volgorde, zo komt geen row na zijn gewenste dag
+    result = np.empty_like(dagen)
+    result[volgorde] = np.repeat(np.array(dagnummers[::-1], dtype=np.int64), genomen[::-1]).astype(dagen.dtype)
+    return result
+
+def _yymmdd(dagen: np.ndarray) -> np.ndarray:
+    jaar = dagen.astype('datetime64[Y]')
+    maand = dagen.astype('datetime64[M]')
+    yy = (jaar.astype(np.int64) + 1970) % 100
+    mm = (maand - jaar).astype(np.int64) + 1
+    dd = (dagen - maand).astype(np.int64) + 1
+    return np.char.zfill(((yy * 100 + mm) * 100 + dd).astype(str), 6)
+
+def generate_klanten(count: int, rng: np.random.Generator) -> tuple[Columns, Columns]:
+    """1/3 Professioneel, 2/3 Particulier. Returns (particulier, professioneel) columns with unique uids."""
+    n_pro = count // 3
+    n_part = count - n_pro
+    # --- Particulier ---
+    is_man = rng.random(n_part) < 0.5
+    voornaam = np.where(is_man, _pick(rng, JONGENSNAMEN, n_part), _pick(rng, MEISJESNAMEN, n_part))
+    gemeente_idx = rng.integers(0, len(GEMEENTES), size=n_part)
+    #unieke (geboortedag, volgnummer) paren
+    dagen = int((GEBOORTE_TOT - GEBOORTE_VAN).astype(np.int64))
+    uniek = rng.choice(dagen * 499, size=n_part, replace=False)
+    geboortedata = GEBOORTE_VAN + (uniek // 499).astype('timedelta64[D]')
+    particulier: Columns = {
+        "naam": _join(voornaam, " ", _pick(rng, FAMILIENAMEN, n_part)),
+        "straat": _pick(rng, STRATEN, n_part),
+        "huisnummer": rng.integers(1, 150, size=n_part),
+        "postcode": np.array([pc for _, pc in GEMEENTES])[gemeente_idx],
+        "gemeente": np.array([g for g, _ in GEMEENTES])[gemeente_idx],
+        "geboortedatum": np.datetime_as_string(geboortedata, unit='D'),
+        "geslacht": np.where(is_man, "M", "V"),
+        "rijksregisternummer": RRN.generate_many(geboortedata, is_man, rng, volgnummers=uniek % 499),
+    }
+    # --- Professioneel ---
+    initialen = [f"{n[0]}." for n in JONGENSNAMEN + MEISJESNAMEN]
+    gemeente_idx = rng.integers(0, len(GEMEENTES), size=n_pro)
+    professioneel: Columns = {
+        "naam": _join(_pick(rng, initialen, n_pro), " ", _pick(rng, FAMILIENAMEN, n_pro), " ", _pick(rng, ACTIVITEITEN, n_pro)),
+        "straat": _pick(rng, BEDRIJFSSTRATEN, n_pro),
+        "huisnummer": rng.integers(1, 200, size=n_pro),
+        "postcode": np.array([pc for _, pc in GEMEENTES])[gemeente_idx],
+        "gemeente": np.array([g for g, _ in GEMEENTES])[gemeente_idx],
+        "btwnummer": BTW.generate_many(n_pro, rng, nummers=rng.choice(20_000_000, size=n_pro, replace=False)),
+    }
+    return particulier, professioneel
+
+def generate_vloot(count: int, rng: np.random.Generator) -> Columns:
+    """Uniform mix of the merk/model catalogue, N1 for the first model of every merk."""
+    catalogus = [(merk, model, "N1" if i == 0 else "M1")
+                 for merk, modellen in WAGENS.items() for i, model in enumerate(modellen) if model is not None]
+    idx = rng.integers(0, len(catalogus), size=count)
+    categorie = np.array([c for _, _, c in catalogus])[idx]
+    is_n1 = categorie == "N1"
+    dagprijs = np.where(is_n1, rng.uniform(45.0, 95.0, size=count), rng.uniform(32.0, 65.0, size=count))
+    #unieke VINs (botsingen zijn astronomisch zeldzaam, maar toch)
+    chassisnummer = VIN.generate_many(count, rng)
+    while len(uniek := np.unique(chassisnummer)) < count:
+        chassisnummer = np.concatenate([uniek, VIN.generate_many(count - len(uniek), rng)])
+    return {
+        "chassisnummer": chassisnummer,
+        "merk": np.array([m for m, _, _ in catalogus])[idx],
+        "model": np.array([m for _, m, _ in catalogus])[idx],
+        "bouwjaar": rng.integers(2017, 2025, size=count).astype(str),
+        "categorie": categorie,
+        "beschikbaar": np.ones(count, dtype=bool),
+        "dagprijs": np.round(dagprijs, 2),
+    }
+
+def generate_reserveringen(count: int, klant_uids: np.ndarray, vloot: Columns, rng: np.random.Generator,
+                           start: date) -> tuple[Columns, Columns]:
+    """
+    Non-overlapping reservations per voertuig. Only the last reservation of a voertuig can still be running,
+    in which case the voertuig is not beschikbaar. Facturen are only issued for returned voertuigen.
+    Mutates vloot['beschikbaar']. Returns (reserveringen, facturen) columns.
+    """
+    n_voertuigen = len(vloot["chassisnummer"])
+    voertuig = np.sort(rng.integers(0, n_voertuigen, size=count))
+    klant = rng.integers(0, len(klant_uids), size=count)
+    # --- Plan per voertuig achter elkaar ---
+    dagen = rng.integers(2, 8, size=count)          #tot - van + 1
+    pauze = rng.integers(0, 15, size=count)
+    eerste = _group_starts(voertuig)
+    laatste = np.r_[voertuig[1:] != voertuig[:-1], True]
+    stap = np.cumsum(pauze + dagen)
+    offset = stap - (pauze + dagen) - (stap[eerste] - (pauze + dagen)[eerste]) + pauze
+    van = np.datetime64(start, 'D') + offset.astype('timedelta64[D]')
+    tot = van + (dagen - 1).astype('timedelta64[D]')
+    # --- Status ---
+    lopend = laatste & (rng.random(count) < 0.25)
+    vloot["beschikbaar"][voertuig[lopend]] = False
+    volgende_pauze = np.r_[pauze[1:], 0]
+    telaat = np.where(~laatste & ~lopend & (rng.random(count) < 0.05), np.minimum(rng.integers(1, 4, size=count), volgende_pauze), 0)
+    ingeleverd = np.where(lopend, False, True).astype(object)
+    ingeleverd[telaat > 0] = np.datetime_as_string(tot[telaat > 0] + telaat[telaat > 0].astype('timedelta64[D]'), unit='D')
+    # --- Nummers: yymmdd-NNN per boekingsdag, hoogstens 999 per dag (zie ReservatieNummer) ---
+    boeking = _cap_per_day(van - rng.integers(0, 30, size=count).astype('timedelta64[D]'), 999)
+    volgorde = np.argsort(boeking, kind='stable')
+    geboekt = boeking[volgorde]
+    volgnummer = np.empty(count, dtype=np.int64)
+    volgnummer[volgorde] = np.arange(count) - _group_starts(geboekt) + 1
+    nummer = _join(_yymmdd(boeking), "-", np.char.zfill(volgnummer.astype(str), 3))
+    reserveringen: Columns = {
+        "nummer": nummer,
+        "klant": klant_uids[klant],
+        "voertuig": vloot["chassisnummer"][voertuig],
+        "van": np.datetime_as_string(van, unit='D'),
+        "tot": np.datetime_as_string(tot, unit='D'),
+        "ingeleverd": ingeleverd,
+    }
+    # --- Facturen: dagprijs × duur + dubbel tarief voor te late dagen ---
+    gefactureerd = ~lopend & vloot["beschikbaar"][voertuig] & (rng.random(count) < 0.8)
+    dagprijs = vloot["dagprijs"][voertuig]
+    bedrag = dagprijs * dagen + np.where(telaat > 0, (dagprijs * telaat) * 2, 0)
+    facturen: Columns = {
+        "reservering": nummer[gefactureerd],
+        "bedrag": bedrag[gefactureerd],
+    }
+    return reserveringen, facturen
+
+def generate_dataset(reserveringen: int = 10_000, klanten: int | None = None, voertuigen: int | None = None,
+                     seed: int | None = None, start: date = date(2025, 1, 1)) -> dict[str, Columns]:
+    """
+    Generate a consistent dataset in the datastore schema, column-wise.
+    Defaults to 1 klant per 2 and 1 voertuig per 8 reserveringen.
+    """
+    rng = np.random.default_rng(seed)
+    klanten = klanten if klanten is not None else max(10, reserveringen // 2)
+    voertuigen = voertuigen if voertuigen is not None else max(10, reserveringen // 8)
+    particulier, professioneel = generate_klanten(klanten, rng)
+    vloot = generate_vloot(voertuigen, rng)
+    klant_uids = np.concatenate([particulier["rijksregisternummer"], professioneel["btwnummer"]])
+    lijst_reserveringen, lijst_facturen = generate_reserveringen(reserveringen, klant_uids, vloot, rng, start)
+    return {
+        "particulier": particulier,
+        "professioneel": professioneel,
+        "voertuigen": vloot,
+        "reserveringen": lijst_reserveringen,
+        "facturen": lijst_facturen,
+    }
+
+def iter_records(columns: Columns, chunk: int = 100_000) -> Iterator[dict[str, Any]]:
+    """Yield JSON-ready dicts, converting the columns one chunk at a time."""
+    keys = list(columns)
+    total = len(columns[keys[0]]) if keys else 0
+    for i in range(0, total, chunk):
+        values = [columns[k][i:i + chunk].tolist() for k in keys]
+        for row in zip(*values):
+            yield dict(zip(keys, row))
+
+def to_json(dataset: dict[str, Columns]) -> dict[str, list[dict[str, Any]]]:
+    """Materialize the dataset as datastore JSON (a dict of lists of dicts)."""
+    return {table: list(iter_records(columns)) for table, columns in dataset.items()}
+
+def write_dataset(dataset: dict[str, Columns], path: str | Path, indent: int | None = None) -> None:
+    """
+    Stream the dataset to a JSON file readable by datastore.read_data.
+    Compact output (indent=None) is written record by record, so memory stays bounded by the columns.
+    """
+    if indent is not None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(to_json(dataset), f, ensure_ascii=False, indent=indent)
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{")
+        for i, (table, columns) in enumerate(dataset.items()):
+            f.write(f'{"," if i else ""}\n"{table}": [')
+            for j, record in enumerate(iter_records(columns)):
+                f.write(f'{"," if j else ""}\n{json.dumps(record, ensure_ascii=False)}')
+            f.write("\n]")
+        f.write("\n}\n")
 
 if __name__ == "__main__":
-    generate_dummy_klanten(20)
-    generate_dummy_vloot(3)
-    generate_dummy_reservaties(20)
-    update_data()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="Generate a synthetic fuzzy-crud dataset.")
+    parser.add_argument("reserveringen", type=int, nargs="?", default=10_000)
+    parser.add_argument("--klanten", type=int, default=None)
+    parser.add_argument("--voertuigen", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", default=TEST_FILE)
+    parser.add_argument("--indent", type=int, default=None)
+    args = parser.parse_args()
+
+    data = generate_dataset(args.reserveringen, args.klanten, args.voertuigen, args.seed)
+    write_dataset(data, args.output, args.indent)
+    print(", ".join(f"{len(next(iter(columns.values())))} {table}" for table, columns in data.items()))
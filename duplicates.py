@@ -0,0 +1,111 @@
+"""
+Duplicate detection over klanten: customers entered twice with a slightly different name or address.
+Klanten are blocked on postcode and gemeente; within a block names are compared pairwise with one cdist call per chunk,
+addresses only for the pairs whose names are close enough. Blocks are scored in worker processes,
+so a scan of 500k klanten takes minutes and start_duplicate_scan keeps it off the UI thread.
+"""
+from collections.abc import Iterable
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+from rapidfuzz import process, fuzz, utils
+
+from datamodel import Klant
+
+#maximaal aantal cellen (bytes, uint8 scores) van een naam matrix
+MAX_CELLS = 1 << 24
+#aantal naam vergelijkingen per taak voor een worker process
+TASK_PAIRS = 1 << 22
+
+class Record(NamedTuple):
+    """What the scan needs of a klant, small to send to a worker process."""
+    uid: str | None
+    naam: str
+    adres: str
+
+class MergeCandidate(NamedTuple):
+    """Two klanten that are probably the same, with the combined, name and address score."""
+    score: float
+    uid_a: str | None
+    uid_b: str | None
+    naam: float
+    adres: float
+
+def records(klanten: Iterable[Klant]) -> dict[tuple[str, str], list[Record]]:
+    """Normalized records of klanten per block (postcode, gemeente)."""
+    blocks: dict[tuple[str, str], list[Record]] = {}
+    for klant in klanten:
+        key = (str(klant.postcode).strip(), utils.default_process(klant.gemeente or ""))
+        adres = utils.default_process(f"{klant.straat} {klant.huisnummer}")
+        blocks.setdefault(key, []).append(Record(klant.uid, utils.default_process(klant.naam or ""), adres))
+    return blocks
+
+def score_block(block: list[Record], threshold: float = 85, naam_cutoff: float = 80) -> list[MergeCandidate]:
+    """
+    Merge candidates within one block: names by token_sort_ratio (Jan Peeters = Peeters Jan),
+    addresses by ratio for the pairs with naam >= naam_cutoff. Combined score 0.6 naam + 0.4 adres.
+    """
+    names = [record.naam for record in block]
+    found: list[MergeCandidate] = []
+    #enkel de bovenste driehoek: rijen i.. tegen kolommen i+1..
+    chunk = max(1, MAX_CELLS // max(1, len(block)))
+    for start in range(0, len(block) - 1, chunk):
+        stop = min(start + chunk, len(block) - 1)
+        scores = process.cdist(names[start:stop], names[start + 1:], scorer=fuzz.token_sort_ratio, processor=None,
+                               score_cutoff=naam_cutoff, dtype=np.uint8, workers=1)
+        rows, cols = np.nonzero(scores)
+        #kolom c hoort bij klant start+1+c, enkel paren met i < j
+        i, j = rows + start, cols + start + 1
+        keep = i < j
+        i, j, naam = i[keep], j[keep], scores[rows[keep], cols[keep]].astype(np.float64)
+        if not len(i):
+            continue
+        adres = process.cpdist([block[a].adres for a in i.tolist()], [block[b].adres for b in j.tolist()],
+                               scorer=fuzz.ratio, processor=None, dtype=np.float64)
+        combined = 0.6 * naam + 0.4 * adres
+        for a, b, score, n, d in zip(i.tolist(), j.tolist(), combined.tolist(), naam.tolist(), adres.tolist()):
+            if score >= threshold:
+                found.append(MergeCandidate(score, block[a].uid, block[b].uid, n, d))
+    return found
+
+def _score_blocks(blocks: list[list[Record]], threshold: float, naam_cutoff: float) -> list[MergeCandidate]:
+    return [candidate for block in blocks for candidate in score_block(block, threshold, naam_cutoff)]
+
+def _tasks(blocks: Iterable[list[Record]]) -> list[list[list[Record]]]:
+    """Blocks grouped into tasks of about TASK_PAIRS name comparisons, largest blocks first."""
+    tasks: list[list[list[Record]]] = []
+    current: list[list[Record]] = []
+    pairs = 0
+    for block in sorted((b for b in blocks if len(b) > 1), key=len, reverse=True):
+        current.append(block)
+        pairs += len(block) * (len(block) - 1) // 2
+        if pairs >= TASK_PAIRS:
+            tasks.append(current)
+            current, pairs = [], 0
+    if current:
+        tasks.append(current)
+    return tasks
+
+def find_duplicates(blocks: dict[tuple[str, str], list[Record]], threshold: float = 85, naam_cutoff: float = 80,
+                    workers: int | None = None) -> list[MergeCandidate]:
+    """
+    Ranked merge candidates over all blocks (see records), best first.
+    workers: number of worker processes, None = one per cpu, 0 = in this process.
+    """
+    tasks = _tasks(blocks.values())
+    if workers == 0 or len(tasks) <= 1:
+        found = [candidate for task in tasks for candidate in _score_blocks(task, threshold, naam_cutoff)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_score_blocks, task, threshold, naam_cutoff) for task in tasks]
+            found = [candidate for future in futures for candidate in future.result()]
+    found.sort(key=lambda candidate: candidate.score, reverse=True)
+    return found
+
+#een scan tegelijk, de workers zijn processen
+_SCANNER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="duplicates")
+
+def start_duplicate_scan(klanten: Iterable[Klant], threshold: float = 85, workers: int | None = None) -> Future[list[MergeCandidate]]:
+    """Snapshot the klanten now and scan them in the background. The future holds the ranked merge candidates."""
+    return _SCANNER.submit(find_duplicates, records(klanten), threshold, workers=workers)
@@ -1,4 +1,5 @@
 import time
+from concurrent.futures import Future
 from datetime import datetime
 from typing import List
 
@@ -13,11 +14,13 @@ from rich.box import ROUNDED, SIMPLE, MINIMAL, SQUARE
 import pygetwindow as gw
 import keyboard
 
-from hawktui import commandField, ObjectEditor, DataTable, Menu
+from hawktui import commandField, ObjectEditor, DataTable, Menu, DiagnosticsPanel, GlobalResults
 from datastore import klanten, voertuigen, reserveringen, facturen, read_data, save_data
 from appstate import AppState, AppMode, ModeKeyBindings
+from diagnostics import memory_report
+from duplicates import MergeCandidate, start_duplicate_scan
 from datamodel import Reservering, Particulier, Professioneel, Voertuig, Factuur
-from datascrivener import TypeScribe, AttributeFilter, InceptionAttributeFilter, RangeFilter, UIDFilter, CompoundFilter, ReservatiemaandFilter
+from datascrivener import TypeScribe, global_search, AttributeFilter, InceptionAttributeFilter, RangeFilter, UIDFilter, RelatedFilter, CompoundFilter, ReservatiemaandFilter
 
 # --- FILTERS OPDRACHT ---
 read_data()
@@ -65,7 +68,11 @@ class TerminalApp:
         self.cmd = commandField(self.state.active_scribe)
         self.editor = ObjectEditor(self.state.active_scribe)
         self.table = DataTable(self.console, self.state.active_scribe)
+        self.diagnostics = DiagnosticsPanel()
+        self.global_results = GlobalResults()
         self.selection_table: DataTable | None = None
+        self.duplicate_scan: Future[list[MergeCandidate]] | None = None
+        self.duplicates: list[MergeCandidate] = []
         
         # Setup event handlers
         self._setup_command_handlers()
@@ -82,6 +89,10 @@ class TerminalApp:
             menu.add_item("Toon Alle", lambda: self._switch_scribe(klanten))
             menu.add_item("Toon Particulier", lambda: self._switch_scribe(klanten, filter_particuliere_klanten))
             menu.add_item("Toon Professioneel", lambda: self._switch_scribe(klanten, filter_zakelijke_klanten))
+            menu.add_item("Toon Historiek", lambda: self._toon_historiek())
+            menu.add_item("Zoek Dubbels", lambda: self._start_duplicate_scan())
+            if self.duplicates:
+                menu.add_item("Toon Dubbels", lambda: self._toon_dubbels())
         elif self.state.active_scribe == voertuigen:
             menu.add_separator("Maak Voertuigen")
             menu.add_item("Maak Voertuig", lambda: self._create_from_menu(voertuigen, Voertuig))
@@ -91,6 +102,7 @@ class TerminalApp:
             menu.add_item("Toon Bestelbusjes", lambda: self._switch_scribe(voertuigen, filter_bestelbusjes))
             menu.add_item("Toon Beschikbaar", lambda: self._switch_scribe(voertuigen, filter_beschikbare_wagens))
             menu.add_item("Gebruikt door Vrouwen", lambda: self._switch_scribe(voertuigen, UIDFilter(uidmacro())))
+            menu.add_item("Toon Historiek", lambda: self._toon_historiek())
             menu.add_item("Stel prijsplafond in", lambda: self.state.enter_request())
         elif self.state.active_scribe == reserveringen:
             menu.add_separator("Maak Reserveringen")
@@ -125,6 +137,8 @@ class TerminalApp:
         menu.add_separator("Systeem")
         menu.add_item("Laad Data", lambda: read_data())
         menu.add_item("Save Data", lambda: save_data())
+        menu.add_item("Geheugenrapport", lambda: self._log_memory_report())
+        menu.add_item("Geheugenpiek Herindexeren", lambda: self._log_memory_report(trace=True))
         menu.add_item("Sluit Programma", lambda: self.exit())
         
         return menu
@@ -149,6 +163,26 @@ class TerminalApp:
         self.menu = self._create_menu()
         self.add_log(f"Switched to {scribe.__class__.__name__.replace('Scribe', '')}")
     
+    def _enter_global(self):
+        """Start a search over all scribes"""
+        self.state.enter_browsing()
+        self.state.mode = AppMode.GLOBAL
+        self.global_results.clear()
+        self.cmd.clear()
+
+    def _jump_to_hit(self):
+        """Switch to the scribe owning the selected global hit and put the cursor on its row"""
+        hit = self.global_results.get_selected()
+        self.cmd.clear()
+        self.global_results.clear()
+        if hit is None:
+            self.state.enter_browsing()
+            return
+        self._switch_scribe(hit.scribe)
+        position = hit.scribe.position(hit.obj)
+        self.table.cursor_index = position if position is not None else 0
+        self.add_log(f"Jumped to {hit.entity} {getattr(hit.obj, 'uid', '')}")
+
     def _create_from_menu(self, scribe: TypeScribe, obj_type: type):
         """Switch to scribe and start creating an object"""
         # Switch scribe first
@@ -181,12 +215,23 @@ class TerminalApp:
                 # Use appropriate scribe for search
                 scribe = self.state.selection_scribe if self.state.mode == AppMode.SELECTING else self.state.active_scribe
                 assert scribe is not None
+                scribe.run_query(query)
                 suggestion = scribe.get_suggestion(query)
                 
                 delta = time.perf_counter_ns() - delta
                 self.add_log(f"Query: {delta/1000:.1f}μs")
                 self.cmd.suggest(suggestion)
                 
+                if self.layout:
+                    self.update_display()
+            elif self.state.mode == AppMode.GLOBAL:
+                delta = time.perf_counter_ns()
+                hits, slow = global_search((klanten, voertuigen, reserveringen, facturen), value or "")
+                delta = time.perf_counter_ns() - delta
+                self.add_log(f"Global query: {delta/1000:.1f}μs" + (f" (te traag: {', '.join(slow)})" if slow else ""))
+                self.global_results.update(hits, slow)
+                self.cmd.suggest(None)
+
                 if self.layout:
                     self.update_display()
         
@@ -194,6 +239,8 @@ class TerminalApp:
         def on_submit(value: str | None):
             if self.state.mode == AppMode.SEARCHING:
                 self.state.enter_browsing()
+            elif self.state.mode == AppMode.GLOBAL:
+                self._jump_to_hit()
             elif self.state.mode == AppMode.SELECTING:
                 self.editor.finish_field_edit()
             elif self.state.mode in (AppMode.EDITING, AppMode.CREATING):
@@ -282,12 +329,49 @@ class TerminalApp:
         reserveringen._last_query = reset_query
         reserveringen.refresh(all=False)
         self.add_log(f"Aantal verhuringen Particulier/Zakelijke: Particulier {aantal_particulier}, Zakelijk {aantal_zakelijk}")
+
+    def _start_duplicate_scan(self):
+        """Scan the klanten for duplicates in worker processes"""
+        if self.duplicate_scan is not None and not self.duplicate_scan.done():
+            self.add_log("Dubbels zoeken loopt nog")
+            return
+        self.duplicate_scan = start_duplicate_scan(klanten.all)
+        self.add_log(f"Dubbels zoeken in {len(klanten.all)} klanten gestart")
+
+    def _poll_duplicate_scan(self):
+        """Pick up the result of a finished duplicate scan"""
+        if self.duplicate_scan is None or not self.duplicate_scan.done():
+            return
+        scan, self.duplicate_scan = self.duplicate_scan, None
+        try:
+            self.duplicates = scan.result()
+        except Exception as e:
+            self.add_log(f"Dubbels zoeken mislukt: {e}")
+            return
+        if self.duplicates:
+            best = self.duplicates[0]
+            self.add_log(f"{len(self.duplicates)} mogelijke dubbels, beste: {best.uid_a} ~ {best.uid_b} ({best.score:.0f})")
+        else:
+            self.add_log("Geen dubbels gevonden")
+        self.menu = self._create_menu()
+
+    def _toon_dubbels(self, limit: int = 50):
+        """Show the klanten of the best merge candidates"""
+        uids = [uid for candidate in self.duplicates[:limit] for uid in (candidate.uid_a, candidate.uid_b) if uid is not None]
+        self._switch_scribe(klanten, UIDFilter(uids))
+
+    def _log_memory_report(self, trace: bool = False):
+        """Log the memory accounting of the active scribe, trace also rebuilds it to measure the peak"""
+        assert self.state.active_scribe is not None
+        self.add_log(memory_report(self.state.active_scribe, trace=trace).summary())
+
     def make_layout(self) -> Layout:
         """Create the application layout"""
         layout = Layout(name="root")
         layout.split(
             Layout(name="header", size=3),
             Layout(name="body", ratio=1),
+            Layout(name="diagnostics", size=11, visible=self.state.diagnostics_open),
             Layout(name="logs", size=6),
             Layout(name="input_area", size=3),
             Layout(name="footer", size=1),
@@ -314,6 +398,11 @@ class TerminalApp:
         self.layout["datatable"].update(self.datatable_panel())
         self.layout["input_area"].update(self.input_field())
         self.layout["footer"].update(self.footer())
+        self.layout["diagnostics"].visible = self.state.diagnostics_open
+        if self.state.diagnostics_open:
+            scribe = self.state.selection_scribe if self.state.mode == AppMode.SELECTING else self.state.active_scribe
+            assert scribe is not None
+            self.layout["diagnostics"].update(self.diagnostics.compose(scribe))
         
         # Update logs
         log_content = Text()
@@ -373,6 +462,8 @@ class TerminalApp:
             if self.selection_table:
                 title_suffix = f"Select {self.state.selecting_for}"
                 return self.selection_table.compose(focused=True, title_suffix=title_suffix)
+        elif self.state.mode == AppMode.GLOBAL:
+            return self.global_results.compose(focused=True)
         
         return self.table.compose(focused=self.state.is_table_focused)
     
@@ -391,6 +482,8 @@ class TerminalApp:
                 placeholder = f"[{self.editor.current_field_name}] Press ENTER to edit"
         elif self.state.mode == AppMode.REQUEST:
             placeholder = f"Voer dagprijs in:"
+        elif self.state.mode == AppMode.GLOBAL:
+            placeholder = "Global Find"
         focus = self.state.is_input_focused or self.editor.is_editing_field
         return self.cmd.compose(focused=focus, placeholder=placeholder)
     
@@ -426,6 +519,8 @@ class TerminalApp:
                 self._handle_browsing_keys(key)
             elif self.state.mode in (AppMode.SEARCHING, AppMode.REQUEST):
                 self._handle_input_keys(key, event)
+            elif self.state.mode == AppMode.GLOBAL:
+                self._handle_global_keys(key, event)
             elif self.state.mode in (AppMode.EDITING, AppMode.CREATING):
                 self._handle_editing_keys(key, event)
             elif self.state.mode == AppMode.SELECTING:
@@ -459,6 +554,10 @@ class TerminalApp:
             assert self.state.return_mode is not None
             self.state.mode = self.state.return_mode
             self.cmd.clear()
+        elif self.state.mode == AppMode.GLOBAL:
+            self.global_results.clear()
+            self.state.enter_browsing()
+            self.cmd.clear()
         else:
             self.state.enter_browsing()
             self.cmd.clear()
@@ -468,6 +567,8 @@ class TerminalApp:
         if key == 'f':
             self.state.mode = AppMode.SEARCHING
             self.cmd.clear()
+        elif key == 'g':
+            self._enter_global()
         elif key == 'j' or key == 'down':
             self.table.cursor_down()
         elif key == 'k' or key == 'up':
@@ -487,6 +588,10 @@ class TerminalApp:
                 self.add_log(f"Creating new {obj_type.__name__}")
         elif key == 'd':
                 obj = self.table.get_selected()
+                dependents = self._dependents(obj)
+                if dependents:
+                    self.add_log(f"Kan {obj.uid} niet verwijderen: nog {len(dependents)} gekoppelde {type(dependents[0]).__name__.lower()}(en)")
+                    return
                 self.add_log(f"Deleting {obj.uid}")
                 self.table.delete_selected()
                 self.update_display()
@@ -494,6 +599,39 @@ class TerminalApp:
             # Open menu
             self.state.enter_menu()
             self.menu.selected_idx = 0
+        elif key == 'p':
+            self._toggle_diagnostics()
+
+    def _toggle_diagnostics(self):
+        """Show/hide the diagnostics panel. Stats are only recorded while it is open."""
+        self.state.diagnostics_open = not self.state.diagnostics_open
+        for scribe in (klanten, voertuigen, reserveringen, facturen):
+            if self.state.diagnostics_open:
+                scribe.enable_stats()
+            else:
+                scribe.disable_stats()
+        self.add_log(f"Diagnostics {'on' if self.state.diagnostics_open else 'off'}")
+
+    def _dependents(self, obj) -> list:
+        """Objects that still reference obj (cascade check before delete)"""
+        if isinstance(obj, (Particulier, Professioneel)):
+            return reserveringen.by_klant(obj)
+        if isinstance(obj, Voertuig):
+            return reserveringen.by_voertuig(obj)
+        if isinstance(obj, Reservering):
+            factuur = facturen.by_reservering(obj)
+            return [factuur] if factuur else []
+        return []
+
+    def _toon_historiek(self):
+        """Show the reservations of the selected klant or voertuig"""
+        obj = self.table.get_selected()
+        if obj is None:
+            return
+        attr = 'klant' if self.state.active_scribe == klanten else 'voertuig'
+        #rijen uit de reverse index i.p.v. een uid-lijst die per rij doorzocht wordt
+        self._switch_scribe(reserveringen, RelatedFilter(reserveringen, attr, obj))
+        self.add_log(f"Historiek {obj.uid}: {len(reserveringen.related(attr, obj))} reservering(en)")
 
     def _handle_menu_keys(self, key: str):
         """Handle keys in menu mode"""
@@ -508,6 +646,8 @@ class TerminalApp:
             # Execute selected menu item
             self.state.enter_browsing()
             self.state.mode = AppMode.SEARCHING
+        elif key == 'g':
+            self._enter_global()
         elif key == 'tab':
             # Execute selected menu item
             self.state.enter_browsing()
@@ -517,6 +657,15 @@ class TerminalApp:
         if key in ('enter', 'tab', 'backspace', 'space') or len(key) == 1:
             self.cmd.key_event(event)
     
+    def _handle_global_keys(self, key: str, event: keyboard.KeyboardEvent):
+        """Handle keys in global search mode: arrows move through the hits, the rest goes to the query"""
+        if key == 'down':
+            self.global_results.cursor_down()
+        elif key == 'up':
+            self.global_results.cursor_up()
+        else:
+            self._handle_input_keys(key, event)
+    
     def _handle_editing_keys(self, key: str, event: keyboard.KeyboardEvent):
         """Handle keys in editing/creating mode"""
         if self.editor.is_editing_field:
@@ -614,6 +763,7 @@ class TerminalApp:
                         keyboard.unhook_all()
                         self.is_hooked = False
                     
+                    self._poll_duplicate_scan()
                     self.update_display()
                     time.sleep(0.05)
         finally:
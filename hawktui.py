@@ -11,7 +11,7 @@ from rich.rule import Rule
 
 import keyboard
 from typing import Literal
-from datascrivener import TypeScribe
+from datascrivener import TypeScribe, GlobalHit
 from datamodel import Particulier, Professioneel
 
 EventTypes = Literal["changed", "submitted", "accepted"]
@@ -193,7 +193,7 @@ class DataTable():
 
         scribe_name = self.scribe.__class__.__name__.replace('Scribe', '')
         filtered = '(All)' if self.scribe._active_filter is None else '(Filtered)'
-        hidden = len(self.scribe._hidden)
+        hidden = self.scribe.hidden
         stats = f"{self.scribe.count} ({hidden} hidden)" if hidden > 0 else f"{self.scribe.count}"
         title_text = f"[{title_style}]{scribe_name}{filtered}[/] - Showing {stats}"
         if title_suffix:
@@ -444,6 +444,74 @@ class ObjectEditor():
             box=SQUARE
         )
     
+class DiagnosticsPanel():
+    """Hot-path counters and timings (μs) of a scribe."""
+    def compose(self, scribe: TypeScribe) -> Panel:
+        scribe_name = scribe.__class__.__name__.replace('Scribe', '')
+        stats = scribe.stats
+        if stats is None:
+            return Panel(Text("Diagnostics disabled", style="dim"), title=f"Diagnostics - {scribe_name}", border_style="bright_black", box=SQUARE)
+        table = Table(expand=True, box=MINIMAL, border_style="bright_black")
+        for col in ("Phase", "Calls", "Items", "Mean", "p50", "p95", "Max", "Total ms"):
+            table.add_column(col, justify="left" if col == "Phase" else "right")
+        for name, phase in stats.phases.items():
+            table.add_row(name, 
+                          str(phase.calls), 
+                          str(phase.items), 
+                          f"{phase.mean_us:.1f}", 
+                          f"≤{phase.percentile(0.5):.0f}", 
+                          f"≤{phase.percentile(0.95):.0f}", 
+                          f"{phase.max_ns/1000:.1f}", 
+                          f"{phase.total_ns/1e6:.2f}",
+                          style="color(250)")
+        counters = "  ".join(f"{k}: {v}" for k, v in stats.counters.items())
+        return Panel(table, title=f"Diagnostics - {scribe_name}", subtitle=counters or None, border_style="bright_black", box=SQUARE)
+
+class GlobalResults():
+    """Ranked hits of a global search over all scribes, tagged by entity type."""
+    def __init__(self):
+        self.hits: list[GlobalHit] = []
+        #entity types die niet binnen het tijdsbudget antwoordden
+        self.slow: list[str] = []
+        self.cursor_index = 0
+
+    def update(self, hits: list[GlobalHit], slow: list[str]):
+        self.hits = hits
+        self.slow = slow
+        self.cursor_index = 0
+
+    def clear(self):
+        self.update([], [])
+
+    def get_selected(self) -> GlobalHit | None:
+        if 0 <= self.cursor_index < len(self.hits):
+            return self.hits[self.cursor_index]
+        return None
+
+    def cursor_down(self):
+        if self.cursor_index < len(self.hits) - 1:
+            self.cursor_index += 1
+
+    def cursor_up(self):
+        if self.cursor_index > 0:
+            self.cursor_index -= 1
+
+    def compose(self, focused: bool) -> Panel:
+        table = Table(expand=True, box=MINIMAL, border_style="bright_black")
+        table.add_column("Type", ratio=2)
+        table.add_column("UID", ratio=3, overflow="ellipsis")
+        table.add_column("Match", ratio=5, overflow="ellipsis")
+        table.add_column("Score", ratio=1, justify="right")
+        for i, hit in enumerate(self.hits):
+            selected = (i == self.cursor_index)
+            row_style = "r bright_white" if selected and focused else f"color({255 - min(15, abs(i - self.cursor_index))})"
+            table.add_row(hit.entity, str(getattr(hit.obj, 'uid', '')), hit.match or "", f"{hit.score:.0f}", style=row_style)
+        title_style = "b white" if focused else "bright_black"
+        title_text = f"[{title_style}]Global Find[/] - Showing {len(self.hits)}"
+        if self.slow:
+            title_text += f" - te traag: {', '.join(self.slow)}"
+        return Panel(table, title=title_text, border_style="bright_black", box=SQUARE)
+
 class MenuItem:
     """A menu item with action"""
     def __init__(self, label: str | None, action: Callable[[], None], is_separator: bool = False):
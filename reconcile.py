@@ -0,0 +1,104 @@
+"""
+Bulk fuzzy matching of external lists (partner exports of names or addresses) against the objects of a scribe.
+Incoming rows are blocked on postcode, every block is scored in one multi-threaded cdist call against the
+objects with that postcode. Rows without a known postcode are scored against everything, in chunks,
+so memory stays bounded by the batch size and not by the size of the list.
+"""
+from collections.abc import Iterable, Iterator, Mapping
+from typing import Any, NamedTuple
+
+import numpy as np
+from rapidfuzz import process, fuzz, utils
+
+from datascrivener import TypeScribe
+
+#maximaal aantal cellen (bytes, uint8 scores) van een score matrix
+MAX_CELLS = 1 << 24
+
+class Reconciled(NamedTuple):
+    """Best match of one incoming row: the row itself, the uid of the match (None below score_cutoff) and its WRatio."""
+    input: Any
+    uid: str | None
+    score: float
+
+class _Block(NamedTuple):
+    choices: list[str]
+    uids: list[str | None]
+
+def _postcode(value: Any) -> str | None:
+    value = str(value).strip() if value is not None else ""
+    return value or None
+
+def _blocks(scribe: TypeScribe[Any], attr: str, block: str) -> tuple[dict[str | None, _Block], _Block]:
+    """Normalized attr and uid of every object, per postcode and all together."""
+    blocks: dict[str | None, _Block] = {}
+    everything = _Block([], [])
+    for obj in scribe.all:
+        value = getattr(obj, attr, None)
+        if value is None:
+            continue
+        choice = utils.default_process(str(value))
+        uid = getattr(obj, 'uid', None)
+        key = _postcode(getattr(obj, block, None))
+        found = blocks.get(key)
+        if found is None:
+            found = blocks[key] = _Block([], [])
+        found.choices.append(choice)
+        found.uids.append(uid)
+        everything.choices.append(choice)
+        everything.uids.append(uid)
+    return blocks, everything
+
+def _best(queries: list[str], candidates: _Block, score_cutoff: float, workers: int) -> list[tuple[str | None, float]]:
+    """Best candidate per query, scored in chunks of at most MAX_CELLS."""
+    if not candidates.choices:
+        return [(None, 0.0)] * len(queries)
+    best: list[tuple[str | None, float]] = []
+    chunk = max(1, MAX_CELLS // len(candidates.choices))
+    for start in range(0, len(queries), chunk):
+        scores = process.cdist(queries[start:start + chunk], candidates.choices, scorer=fuzz.WRatio, processor=None,
+                               score_cutoff=score_cutoff, dtype=np.uint8, workers=workers)
+        top = scores.argmax(axis=1)
+        for i, j in enumerate(top.tolist()):
+            score = float(scores[i, j])
+            best.append((candidates.uids[j], score) if score else (None, 0.0))
+    return best
+
+def reconcile(scribe: TypeScribe[Any], rows: Iterable[Mapping[str, Any] | str], attr: str = 'naam', block: str = 'postcode',
+              score_cutoff: float = 80, batch: int = 5000, workers: int = -1) -> Iterator[Reconciled]:
+    """
+    Match incoming rows against the attr of the objects of a scribe (klanten by default), yielding one Reconciled
+    per row in input order. A row is a str, or a mapping with attr and optionally block (postcode);
+    rows whose postcode has no objects are matched against all objects.
+    The rows are read batch by batch, so a list of 100k rows can be streamed from a file.
+    """
+    blocks, everything = _blocks(scribe, attr, block)
+    pending: list[Mapping[str, Any] | str] = []
+    for row in rows:
+        pending.append(row)
+        if len(pending) >= batch:
+            yield from _reconcile_batch(pending, blocks, everything, attr, block, score_cutoff, workers)
+            pending = []
+    if pending:
+        yield from _reconcile_batch(pending, blocks, everything, attr, block, score_cutoff, workers)
+
+def _reconcile_batch(rows: list[Mapping[str, Any] | str], blocks: dict[str | None, _Block], everything: _Block,
+                     attr: str, block: str, score_cutoff: float, workers: int) -> Iterator[Reconciled]:
+    #rij indexen per postcode, None = geen (gekende) postcode
+    grouped: dict[str | None, list[int]] = {}
+    queries: list[str] = []
+    for i, row in enumerate(rows):
+        if isinstance(row, str):
+            value, key = row, None
+        else:
+            value, key = row.get(attr), _postcode(row.get(block))
+        queries.append(utils.default_process(str(value)) if value is not None else "")
+        grouped.setdefault(key if key in blocks else None, []).append(i)
+    results: list[tuple[str | None, float]] = [(None, 0.0)] * len(rows)
+    for key, indexes in grouped.items():
+        candidates = blocks[key] if key is not None else everything
+        matches = _best([queries[i] for i in indexes], candidates, score_cutoff, workers)
+        for i, match in zip(indexes, matches):
+            results[i] = match
+    for row, (uid, score) in zip(rows, results):
+        yield Reconciled(row, uid, score)
@@ -0,0 +1,593 @@
+"""
+Dictionary encoded search columns for the scribes.
+Every searchable attribute keeps each distinct string once, with an int32 code per row.
+A fuzzy query is scored once per distinct value and mapped back to the rows.
+Values are normalized with default_process when they enter the dictionary, so scoring only normalizes the query.
+Scoped query terms (attr:value) are answered by secondary Field indexes, before any fuzzy scoring.
+Tab completion bisects a sorted list of the distinct normalized words per column, kept in step with every change.
+Identifiers (rrn, btw, chassisnummer, reservatienummer) are looked up by edit distance in a BK-tree instead of WRatio.
+Name-like columns keep Dutch phonetic keys per value, so a name only has to be scored against the values that sound alike.
+"""
+import operator
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from datetime import date
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Callable, Iterable, NamedTuple
+
+import numpy as np
+from rapidfuzz import process, fuzz, utils
+from rapidfuzz.distance import Levenshtein
+
+def cutoff(word: str) -> float:
+    """Minimum WRatio for a word to match, stricter for longer words."""
+    return 40 + min(30, 6*len(word))
+
+#gemeente:hasselt, dagprijs:<50, van:2025-10, duur:>=3
+_TERM = re.compile(r'^([A-Za-z_]\w*):(<=|>=|<|>)?(.*)$')
+_COMPARE: dict[str, Callable[[Any, Any], bool]] = {'<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge}
+
+class Term(NamedTuple):
+    """Scoped query term attr:value (prefix match) or attr:<value, <=, >, >= (range)."""
+    attr: str
+    op: str
+    value: str
+
+    def __str__(self) -> str:
+        return f"{self.attr}:{'' if self.op == ':' else self.op}{self.value}"
+
+    def matches(self, value: Any) -> bool:
+        if value is None:
+            return False
+        if self.op == ':':
+            term = self.value.casefold()
+            if isinstance(value, date):
+                return value.isoformat().startswith(term)
+            names = (str(value), value.name) if isinstance(value, Enum) else (str(value),)
+            return any(name.casefold().startswith(term) for name in names)
+        try:
+            if isinstance(value, date):
+                bound: Any = _parse_date(self.value)
+            elif isinstance(value, (int, float)):
+                bound = float(self.value)
+            else:
+                value, bound = str(value).casefold(), self.value.casefold()
+        except ValueError:
+            return False
+        return _COMPARE[self.op](value, bound)
+
+def _parse_date(data: str) -> date:
+    """ISO date, or the first day of 'YYYY-MM' / 'YYYY'."""
+    parts = data.split('-')
+    if len(parts) == 3:
+        return date.fromisoformat(data)
+    return date(int(parts[0]), int(parts[1]) if len(parts) == 2 else 1, 1)
+
+def parse_query(query: str) -> tuple[tuple[Term, ...], str]:
+    """Split a query in scoped terms and the free text that is fuzzy scored. Terms without a value are skipped."""
+    terms: list[Term] = []
+    words: list[str] = []
+    for word in query.split():
+        found = _TERM.match(word)
+        if found is None:
+            words.append(word)
+        elif found[3]:
+            terms.append(Term(found[1].lower(), found[2] or ':', found[3]))
+    return tuple(terms), " ".join(words)
+
+class Field:
+    """Secondary index on any attribute, for scoped terms: distinct raw values and a code per row (-1 = None)."""
+    __slots__ = ('name', 'values', 'codes')
+
+    def __init__(self, name: str, objects: Iterable[Any]):
+        self.name = name
+        self.values: list[Any] = []
+        lookup: dict[Any, int] = {}
+        def encode(value: Any) -> int:
+            if value is None:
+                return -1
+            #niet hashbare waarden (dataclasses) op hun tekst
+            key = value if type(value).__hash__ is not None else str(value)
+            code = lookup.get(key)
+            if code is None:
+                code = lookup[key] = len(self.values)
+                self.values.append(key)
+            return code
+        self.codes: np.ndarray = np.fromiter((encode(getattr(obj, name, None)) for obj in objects), dtype=np.int32)
+
+    def mask(self, term: Term, rows: np.ndarray) -> np.ndarray:
+        """Which rows match the term, evaluated once per distinct value."""
+        #laatste plaats van de tabel blijft False voor code -1
+        table = np.zeros(len(self.values) + 1, dtype=bool)
+        table[:-1] = [term.matches(value) for value in self.values]
+        return table[self.codes[rows]]
+
+def _completion_words(value: str) -> set[str]:
+    """Words of a normalized value, and the value itself when it has several."""
+    parts = value.split()
+    words = set(parts)
+    if len(parts) > 1:
+        #default_process laat dubbele spaties achter waar leestekens stonden
+        words.add(" ".join(parts))
+    return words
+
+class Completions:
+    """
+    Distinct normalized words of a column with the number of rows holding them, sorted for prefix lookups.
+    Values of several words are kept whole as well, so a multi-word prefix completes within one value.
+    Built once, then kept up to date per changed value (see add), so a change doesn't cost a full sort.
+    """
+    __slots__ = ('processed', 'counts', 'words')
+
+    def __init__(self, processed: list[str], codes: np.ndarray):
+        #de lijst van de kolom zelf, die groeit mee met nieuwe waarden
+        self.processed = processed
+        rows = np.bincount(codes[codes >= 0], minlength=len(processed)).tolist()
+        counts: dict[str, int] = {}
+        for value, n in zip(processed, rows):
+            if n:
+                for word in _completion_words(value):
+                    counts[word] = counts.get(word, 0) + n
+        self.counts = counts
+        self.words: list[str] = sorted(counts)
+
+    def add(self, codes: np.ndarray, sign: int = 1) -> None:
+        """Count the values of codes (one per row, -1 skipped) once more, or once less with sign -1."""
+        codes = codes[codes >= 0]
+        if not len(codes):
+            return
+        counts, words = self.counts, self.words
+        distinct, rows = np.unique(codes, return_counts=True)
+        for code, n in zip(distinct.tolist(), rows.tolist()):
+            for word in _completion_words(self.processed[code]):
+                total = counts.get(word, 0) + sign*n
+                if total > 0:
+                    if word not in counts:
+                        insort(words, word)
+                    counts[word] = total
+                elif counts.pop(word, None) is not None:
+                    del words[bisect_left(words, word)]
+
+    def complete(self, prefix: str, k: int) -> tuple[str, int] | None:
+        """
+        Most common of the first k words starting with prefix (longer than it) and its count, in O(log n + k).
+        The prefix itself only when nothing longer starts with it.
+        """
+        words = self.words
+        best: tuple[str, int] | None = None
+        start = bisect_left(words, prefix)
+        for word in words[start:start + k]:
+            if not word.startswith(prefix):
+                break
+            if word != prefix and (best is None or self.counts[word] > best[1]):
+                best = (word, self.counts[word])
+        if best is None and start < len(words) and words[start] == prefix:
+            return prefix, 0
+        return best
+
+def identifier_key(value: str) -> str:
+    """An identifier without case and punctuation: 87.11.01-777.30 -> 87110177730."""
+    return "".join(ch for ch in value.casefold() if ch.isalnum())
+
+def is_identifier(key: str) -> bool:
+    """Whether a query word looks like an identifier: long enough and holding a digit."""
+    return len(key) >= 6 and any(ch.isdigit() for ch in key)
+
+class EditIndex:
+    """
+    BK-tree over identifiers, for lookups within a Levenshtein distance.
+    Node 0 is the root, every child sits at its distance to the parent; a node holds the raw values with its key.
+    Values are only added, so the tree outlives the SearchIndex it was built for (see TypeScribe.refresh).
+    For lookups the edges are kept flat in arrays, so every level of the tree is compared in one cdist call.
+    """
+    __slots__ = ('keys', 'values', 'children', 'nodes', 'flat')
+
+    def __init__(self):
+        self.keys: list[str] = []
+        self.values: list[list[str]] = []
+        self.children: list[dict[int, int]] = []
+        #raw waarde -> node
+        self.nodes: dict[str, int] = {}
+        #keys, eerste edge per node, afstand en kind per edge; None na nieuwe nodes
+        self.flat: tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray] | None = None
+
+    def extend(self, values: Iterable[str]) -> None:
+        """Insert values not seen before."""
+        nodes = self.nodes
+        for value in values:
+            if value in nodes:
+                continue
+            key = identifier_key(value)
+            node = 0
+            while self.keys:
+                distance = Levenshtein.distance(key, self.keys[node])
+                if not distance:
+                    break
+                child = self.children[node].get(distance)
+                if child is None:
+                    self.children[node][distance] = len(self.keys)
+                    node = len(self.keys)
+                    break
+                node = child
+            if node == len(self.keys):
+                self.keys.append(key)
+                self.values.append([])
+                self.children.append({})
+                self.flat = None
+            self.values[node].append(value)
+            nodes[value] = node
+
+    def flatten(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Flat arrays of the tree, rebuilt after new nodes."""
+        if self.flat is None:
+            counts = np.fromiter((len(c) for c in self.children), dtype=np.int64, count=len(self.children))
+            start = np.zeros(len(counts) + 1, dtype=np.int64)
+            np.cumsum(counts, out=start[1:])
+            distances = np.fromiter((d for c in self.children for d in c), dtype=np.int64, count=int(start[-1]))
+            children = np.fromiter((n for c in self.children for n in c.values()), dtype=np.int64, count=int(start[-1]))
+            self.flat = np.array(self.keys, dtype=object), start, distances, children
+        return self.flat
+
+    def lookup(self, key: str, max_distance: int) -> tuple[np.ndarray, np.ndarray, int]:
+        """Nodes within max_distance of key, their distances and the number of distances computed."""
+        if not self.keys:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), 0
+        keys, start, distances, children = self.flatten()
+        level = np.zeros(1, dtype=np.int64)
+        found, found_distances, computed = [], [], 0
+        while len(level):
+            computed += len(level)
+            d = process.cdist([key], keys[level].tolist(), scorer=Levenshtein.distance, dtype=np.int64)[0]
+            hit = d <= max_distance
+            found.append(level[hit])
+            found_distances.append(d[hit])
+            #driehoeksongelijkheid: enkel kinderen op afstand d ± max_distance van de parent
+            counts = start[level + 1] - start[level]
+            total = int(counts.sum())
+            if not total:
+                break
+            edges = np.repeat(start[level] - np.cumsum(counts) + counts, counts) + np.arange(total)
+            keep = np.abs(distances[edges] - np.repeat(d, counts)) <= max_distance
+            level = children[edges[keep]]
+        return np.concatenate(found), np.concatenate(found_distances), computed
+
+#klanken die in het Nederlands (bijna) hetzelfde klinken, in volgorde toegepast
+_SOUNDS = [(re.compile(pattern), sound) for pattern, sound in (
+    (r'sch$', 's'), (r'sch', 'sg'), (r'ch|gh', 'g'), (r'ph', 'f'), (r'th', 't'), (r'dt$|d$', 't'),
+    (r'c(?=[eiy])', 's'), (r'ck|c|q', 'k'), (r'x', 'ks'), (r'v', 'f'), (r'z', 's'), (r'(?<=.)h', ''),
+)]
+_VOWELS = re.compile(r'[aeiouy]+')
+_DOUBLES = re.compile(r'(.)\1+')
+#tussenvoegsels, aan elkaar of los geschreven: Van den Berghe, Vandenberghe
+_PARTICLES = frozenset(('van', 'de', 'den', 'der', 'ter', 'ten', 'te', 'vande', 'vanden', 'vander', 'le', 'la', 'du', 'des', 'di'))
+
+@lru_cache(maxsize=1 << 16)
+def _sounds(token: str) -> str:
+    token = "".join(ch for ch in unicodedata.normalize('NFKD', token) if ch.isalpha() and not unicodedata.combining(ch))
+    for pattern, sound in _SOUNDS:
+        token = pattern.sub(sound, token)
+    return token
+
+@lru_cache(maxsize=1 << 16)
+def _skeleton(sounds: str) -> str:
+    """First letter (any vowel as 'a') and the consonants after it, without doubles."""
+    if not sounds:
+        return ""
+    first = 'a' if sounds[0] in 'aeiouy' else sounds[0]
+    return _DOUBLES.sub(r'\1', first + _VOWELS.sub('', sounds[1:]))
+
+def phonetic_key(word: str) -> str:
+    """Dutch phonetic key of a (normalized) query word: Pieters, Peeters -> ptrs, Vandenberge -> fndnbrg."""
+    return _skeleton("".join(_sounds(token) for token in word.split()))
+
+def phonetic_keys(value: str) -> set[str]:
+    """
+    Phonetic keys of a normalized value: one per word, one for all words together
+    and one per tussenvoegsel with the words up to the name after it.
+    """
+    tokens = value.split()
+    sounds = [_sounds(token) for token in tokens]
+    keys = {_skeleton(sound) for token, sound in zip(tokens, sounds) if token not in _PARTICLES}
+    for i, token in enumerate(tokens):
+        if token in _PARTICLES:
+            joined = ""
+            for j in range(i, len(tokens)):
+                joined += sounds[j]
+                if tokens[j] not in _PARTICLES:
+                    keys.add(_skeleton(joined))
+                    break
+    if len(tokens) > 1:
+        #aan elkaar getypt: Sint-Truiden als sinttruiden
+        keys.add(_skeleton("".join(sounds)))
+    #een letter of minder zegt niets
+    return {key for key in keys if len(key) > 1}
+
+class Column:
+    """
+    One searchable attribute: distinct str values (raw and normalized) and a code per row (-1 = None).
+    A phonetic column also keeps buckets of codes per phonetic key, maintained as values are encoded.
+    """
+    __slots__ = ('name', 'values', 'processed', 'lookup', 'codes', 'phonetic', 'sounds', 'min_key')
+
+    def __init__(self, name: str, objects: Iterable[Any] = (), phonetic: bool = False, min_key: int = 2):
+        self.name = name
+        self.values: list[str] = []
+        #default_process(value), zelfde instance als value wanneer er niets verandert
+        self.processed: list[str] = []
+        self.lookup: dict[str, int] = {}
+        self.codes: np.ndarray = np.empty(0, dtype=np.int32)
+        #phonetic key -> codes, None voor andere kolommen
+        self.phonetic: dict[str, list[int]] | None = {} if phonetic else None
+        #gesorteerde phonetic keys, None na nieuwe keys tot settle
+        self.sounds: list[str] | None = None
+        #kortste key die een waarde op de cutoff zet, kortere keys leveren enkel kandidaten
+        self.min_key = min_key
+        self.extend(objects)
+
+    def encode(self, value: Any) -> int:
+        """Code of a value, adds it to the dictionary when new."""
+        if value is None:
+            return -1
+        value = str(value)
+        code = self.lookup.get(value)
+        if code is None:
+            code = self.lookup[value] = len(self.values)
+            self.values.append(value)
+            processed = utils.default_process(value)
+            self.processed.append(value if processed == value else processed)
+            if self.phonetic is not None:
+                for key in phonetic_keys(processed):
+                    bucket = self.phonetic.get(key)
+                    if bucket is None:
+                        bucket = self.phonetic[key] = []
+                        self.sounds = None
+                    bucket.append(code)
+        return code
+
+    def settle(self) -> None:
+        """Sort the phonetic keys added since the last settle, so sounds_like only reads."""
+        if self.phonetic is not None and self.sounds is None:
+            self.sounds = sorted(self.phonetic)
+
+    def sounds_like(self, key: str) -> tuple[list[int], list[int]]:
+        """
+        Codes of the values with a phonetic key starting with key, so a name that is still being typed keeps its bucket,
+        and the codes of the values with exactly that key (none when the key is shorter than min_key).
+        """
+        assert self.sounds is not None and self.phonetic is not None
+        codes: list[int] = []
+        for i in range(bisect_left(self.sounds, key), len(self.sounds)):
+            if not self.sounds[i].startswith(key):
+                break
+            codes.extend(self.phonetic[self.sounds[i]])
+        return codes, self.phonetic.get(key, []) if len(key) >= self.min_key else []
+
+    def extend(self, objects: Iterable[Any]) -> None:
+        name = self.name
+        new = np.fromiter((self.encode(getattr(obj, name, None)) for obj in objects), dtype=np.int32)
+        self.codes = np.concatenate((self.codes, new)) if len(self.codes) else new
+        self.settle()
+
+    def value(self, row: int) -> str | None:
+        code = self.codes[row]
+        return self.values[code] if code >= 0 else None
+
+    def score(self, query: str, rows: np.ndarray, score_cutoff: float, candidates: list[int] | None = None,
+              exact: list[int] = ()) -> tuple[np.ndarray, int]:
+        """
+        WRatio of a normalized query per row (0 below score_cutoff) and the number of distinct values scored.
+        candidates: only score these codes (phonetic buckets);
+        exact: the candidates with exactly the phonetic key of the query, they score at least score_cutoff.
+        """
+        codes = self.codes[rows]
+        #laatste plaats van de tabel blijft 0 voor code -1
+        present = np.zeros(len(self.values) + 1, dtype=bool)
+        present[codes] = True
+        present[-1] = False
+        if candidates is not None:
+            bucket = np.zeros(len(present), dtype=bool)
+            bucket[candidates] = True
+            present &= bucket
+        distinct = np.flatnonzero(present)
+        table = np.zeros(len(self.values) + 1, dtype=np.float64)
+        if len(distinct):
+            choices = [self.processed[code] for code in distinct]
+            scores = process.cdist([query], choices, scorer=fuzz.WRatio, processor=None,
+                                   score_cutoff=0 if candidates is not None else score_cutoff, dtype=np.float64)[0]
+            table[distinct] = scores
+            if candidates is not None:
+                #een prefix van een key is te ruim om op te vertrouwen, de key zelf niet
+                sure = np.zeros(len(present), dtype=bool)
+                sure[exact] = True
+                sure &= present
+                table[sure] = np.maximum(table[sure], score_cutoff)
+                table[table < score_cutoff] = 0
+        return table[codes], len(distinct)
+
+    def score_identifier(self, edits: EditIndex, key: str, rows: np.ndarray) -> tuple[np.ndarray, int]:
+        """
+        Score of an identifier key per row by edit distance, closest first: distance 1, else 2 for long keys.
+        100 for an exact match, minus the share of the key that had to change. Also returns the distances computed.
+        """
+        table = np.zeros(len(self.values) + 1, dtype=np.float64)
+        computed = 0
+        for max_distance in ((1, 2) if len(key) >= 12 else (1,)):
+            nodes, distances, n = edits.lookup(key, max_distance)
+            computed += n
+            if len(nodes):
+                scores = 100 * (1 - distances / len(key))
+                for node, score in zip(nodes.tolist(), scores.tolist()):
+                    for value in edits.values[node]:
+                        code = self.lookup.get(value)
+                        if code is not None:
+                            table[code] = score
+                break
+        return table[self.codes[rows]], computed
+
+class SearchIndex:
+    """
+    Dictionary encoded columns for the searchable attributes of a scribe, one row per object.
+    The identifier column (if any) is scored by edit distance for words that look like an identifier.
+    Everything is built by the owning thread (extend, update, drop, reencode, prepare); score only reads,
+    so global_search can run it in worker threads.
+    """
+    __slots__ = ('columns', 'fields', 'completions', 'identifier', 'edits', 'edited')
+
+    def __init__(self, attributes: tuple[str, ...], objects: Iterable[Any] = (), identifier: str | None = None,
+                 edits: EditIndex | None = None, phonetic: tuple[str, ...] = (), min_keys: dict[str, int] | None = None):
+        objects = list(objects)
+        min_keys = min_keys or {}
+        self.columns = [Column(attr, objects, attr in phonetic, min_keys.get(attr, 2)) for attr in attributes]
+        self.identifier: int = attributes.index(identifier) if identifier in attributes else -1
+        #BK-tree van de identifier kolom, lui opgebouwd door prepare en daarna enkel aangevuld (waarden verdwijnen nooit)
+        self.edits: EditIndex | None = edits
+        #aantal waarden van de identifier kolom in edits
+        self.edited: int = 0
+        #secundaire indexes voor scoped termen, lui opgebouwd en weggegooid bij elke wijziging
+        self.fields: dict[str, Field] = {}
+        #woorden voor tab completion per kolom, lui opgebouwd en daarna per wijziging bijgewerkt
+        self.completions: dict[str, Completions] = {}
+
+    def __len__(self) -> int:
+        return len(self.columns[0].codes) if self.columns else 0
+
+    def _invalidate(self) -> None:
+        self.fields.clear()
+
+    def _recount(self, column: Column, old: np.ndarray, new: np.ndarray) -> None:
+        """Move the completion counts of a column from the old to the new codes of some rows."""
+        completions = self.completions.get(column.name)
+        if completions is not None:
+            completions.add(old, -1)
+            completions.add(new)
+
+    def extend(self, objects: list[Any]) -> None:
+        self._invalidate()
+        start = len(self)
+        for column in self.columns:
+            column.extend(objects)
+            self._recount(column, column.codes[:0], column.codes[start:])
+
+    def update(self, row: int, obj: Any) -> None:
+        """Re-encode one row after its object changed."""
+        self._invalidate()
+        for column in self.columns:
+            old = column.codes[row:row + 1].copy()
+            column.codes[row] = column.encode(getattr(obj, column.name, None))
+            column.settle()
+            self._recount(column, old, column.codes[row:row + 1])
+
+    def drop(self, rows: np.ndarray) -> None:
+        """Forget the values of removed rows, their row ids stay as tombstones (code -1)."""
+        self._invalidate()
+        for column in self.columns:
+            self._recount(column, column.codes[rows], column.codes[:0])
+            column.codes[rows] = -1
+
+    def reencode(self, rows: np.ndarray, objects: list[Any], names: Iterable[str]) -> np.ndarray:
+        """Re-encode the named columns for rows (with their objects in the same order). Returns which rows changed."""
+        changed = np.zeros(len(rows), dtype=bool)
+        self._invalidate()
+        for column in self.columns:
+            if column.name in names:
+                name = column.name
+                codes = np.fromiter((column.encode(getattr(obj, name, None)) for obj in objects), dtype=np.int32, count=len(objects))
+                old = column.codes[rows]
+                differs = old != codes
+                changed |= differs
+                column.codes[rows] = codes
+                column.settle()
+                self._recount(column, old[differs], codes[differs])
+        return changed
+
+    def prepare(self, word: str) -> None:
+        """Build what scoring word needs and score does not build itself: the BK-tree of an identifier-like word."""
+        if self.identifier < 0 or not is_identifier(identifier_key(word)):
+            return
+        column = self.columns[self.identifier]
+        if self.edits is None:
+            self.edits = EditIndex()
+        if self.edited < len(column.values):
+            self.edits.extend(column.values[self.edited:])
+            self.edited = len(column.values)
+        self.edits.flatten()
+
+    def score(self, word: str, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray, int]:
+        """
+        Best score per row over all columns, the column it came from (-1 = no match)
+        and the number of WRatio (and Levenshtein) computations, for the diagnostics.
+        Ties go to the earlier column, like extractOne over the attributes in order.
+        Without prepare an identifier is scored by WRatio like any other word.
+        """
+        best = np.zeros(len(rows), dtype=np.float64)
+        match = np.full(len(rows), -1, dtype=np.int8)
+        #query een keer normaliseren, de waarden zijn het al
+        query, score_cutoff = utils.default_process(word), cutoff(word)
+        key = identifier_key(word) if self.identifier >= 0 else ""
+        buckets = self._buckets(query)
+        total = 0
+        for i, column in enumerate(self.columns):
+            scores, scored = np.empty(0), 0
+            if buckets is not None and column.phonetic is not None:
+                scores, scored = column.score(query, rows, score_cutoff, *buckets[i])
+                total += scored
+                better = scores > best
+                best[better] = scores[better]
+                match[better] = i
+                continue
+            if buckets is not None and i == self.identifier:
+                #een woord dat als een naam klinkt is geen identifier
+                continue
+            if i == self.identifier and self.edits is not None and is_identifier(key):
+                scores, scored = column.score_identifier(self.edits, key, rows)
+            if not scores.any():
+                #geen identifier binnen afstand 2, vb. een prefix tijdens het typen
+                scores, more = column.score(query, rows, score_cutoff)
+                scored += more
+            total += scored
+            better = scores > best
+            best[better] = scores[better]
+            match[better] = i
+        return best, match, total
+
+    def _buckets(self, query: str) -> dict[int, tuple[list[int], list[int]]] | None:
+        """
+        Phonetic bucket per phonetic column for a normalized query word of 4+ letters.
+        None when no value sounds alike (or the word is no name), then every column is scored in full.
+        """
+        if len(query) < 4 or not query.replace(" ", "").isalpha():
+            return None
+        key = phonetic_key(query)
+        buckets = {i: column.sounds_like(key) for i, column in enumerate(self.columns) if column.phonetic is not None}
+        return buckets if any(codes for codes, _ in buckets.values()) else None
+
+    def complete(self, prefix: str, k: int = 16) -> str | None:
+        """
+        Completion of a prefix: the most common normalized word (or whole value) starting with it over all columns
+        but the identifier column. Ties go to the earlier column. None when nothing has the prefix.
+        """
+        prefix = utils.default_process(prefix)
+        if not prefix:
+            return None
+        best: tuple[str, int] | None = None
+        for i, column in enumerate(self.columns):
+            if i == self.identifier:
+                #unieke codes, niets om aan te vullen
+                continue
+            self.build_completions((column.name,))
+            found = self.completions[column.name].complete(prefix, k)
+            if found is not None and (best is None or found[1] > best[1]):
+                best = found
+        return best[0] if best else None
+
+    def build_completions(self, names: Iterable[str]) -> None:
+        """Build the completions of the named columns that don't have them yet, vb. right after a rebuild."""
+        for column in self.columns:
+            if column.name in names and column.name not in self.completions:
+                self.completions[column.name] = Completions(column.processed, column.codes)
+
+    def match(self, row: int, column: int) -> str | None:
+        """The matched string of a row."""
+        return self.columns[column].value(row) if column >= 0 else None